@@ -2,8 +2,16 @@
 """Function that calculates the determinant of a matrix"""
 
 
-def determinant(matrix):
-    """Function that calculates the determinant of a matrix"""
+det = __import__('lu_engine').det
+MinorCache = __import__('minor_cache').MinorCache
+
+
+def determinant(matrix, expansion=False):
+    """Function that calculates the determinant of a matrix
+
+    expansion=True keeps exact cofactor expansion, memoized over the
+    sub-minors by MinorCache, instead of the LU/Bareiss engine
+    """
     if type(matrix) is not list or len(matrix) == 0:
         raise TypeError("matrix must be a list of lists")
     if len(matrix) > 0:
@@ -19,13 +27,6 @@ def determinant(matrix):
         return matrix[0][0]
     if len(matrix) == 2:
         return ((matrix[0][0] * matrix[1][1]) - (matrix[0][1] * matrix[1][0]))
-    det = []
-    for i in range(len(matrix)):
-        mini = [[j for j in matrix[i]] for i in range(1, len(matrix))]
-        for j in range(len(mini)):
-            mini[j].pop(i)
-        if i % 2 == 0:
-            det.append(matrix[0][i] * determinant(mini))
-        if i % 2 == 1:
-            det.append(-1 * matrix[0][i] * determinant(mini))
-    return sum(det)
+    if expansion:
+        return MinorCache(matrix).det()
+    return det(matrix)
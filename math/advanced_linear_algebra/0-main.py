@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+from fractions import Fraction
+import random
+import time
+determinant = __import__('0-determinant').determinant
+
+
+def laplace(matrix):
+    """Determinant by cofactor expansion along the first row"""
+    if len(matrix) == 1:
+        return matrix[0][0]
+    if len(matrix) == 2:
+        return ((matrix[0][0] * matrix[1][1]) - (matrix[0][1] * matrix[1][0]))
+    det = 0
+    for i in range(len(matrix)):
+        mini = [row[:i] + row[i + 1:] for row in matrix[1:]]
+        det += (-1) ** i * matrix[0][i] * laplace(mini)
+    return det
+
+
+if __name__ == "__main__":
+    mixed = determinant([[1, 2, 3], [4, 5, 6], [7, 8, Fraction(10)]])
+    assert type(mixed) is Fraction and mixed == -3, mixed
+    print("mixed int/Fraction determinant:", repr(mixed))
+
+    random.seed(0)
+    for n in (3, 5, 8, 10, 25, 50, 100, 200):
+        ints = [[random.randint(-9, 9) for _ in range(n)] for _ in range(n)]
+        floats = [[random.random() for _ in range(n)] for _ in range(n)]
+        start = time.perf_counter()
+        exact = determinant(ints)
+        exact_time = time.perf_counter() - start
+        start = time.perf_counter()
+        determinant(floats)
+        float_time = time.perf_counter() - start
+        line = "n={:<4} LU {:9.4f}s  Bareiss {:9.4f}s".format(
+            n, float_time, exact_time)
+        if n <= 8:
+            start = time.perf_counter()
+            expected = laplace(ints)
+            laplace_time = time.perf_counter() - start
+            line += "  Laplace {:9.4f}s  exact match: {}".format(
+                laplace_time, expected == exact)
+            assert expected == exact, n
+        print(line)
@@ -2,24 +2,16 @@
 """Function that calculates the minor matrix of a matrix"""
 
 
-def determinant(matrix):
-    """Function that calculates the determinant of a matrix"""
-    if len(matrix) == 2:
-        return ((matrix[0][0] * matrix[1][1]) - (matrix[0][1] * matrix[1][0]))
-    det = []
-    for i in range(len(matrix)):
-        mini = [[j for j in matrix[i]] for i in range(1, len(matrix))]
-        for j in range(len(mini)):
-            mini[j].pop(i)
-        if i % 2 == 0:
-            det.append(matrix[0][i] * determinant(mini))
-        if i % 2 == 1:
-            det.append(-1 * matrix[0][i] * determinant(mini))
-    return sum(det)
+LUFactorization = __import__('lu_engine').LUFactorization
+MinorCache = __import__('minor_cache').MinorCache
+
 
+def minor(matrix, expansion=False):
+    """Function that calculates the minor matrix of a matrix
 
-def minor(matrix):
-    """Function that calculates the minor matrix of a matrix"""
+    expansion=True uses exact cofactor expansion, memoized over the
+    sub-minors by MinorCache, instead of the shared LU factorization
+    """
     if type(matrix) is not list or len(matrix) == 0:
         raise TypeError("matrix must be a list of lists")
     for i in matrix:
@@ -33,12 +25,6 @@ def minor(matrix):
     if len(matrix) == 2:
         minor = [i[::-1] for i in matrix]
         return minor[::-1]
-    minor = [[j for j in matrix[i]] for i in range(len(matrix))]
-    for i in range(len(matrix)):
-        for j in range(len(matrix[i])):
-            mini = [[j for j in matrix[i]] for i in range(len(matrix))]
-            mini = mini[:i] + mini[i + 1:]
-            for k in range(len(mini)):
-                mini[k].pop(j)
-            minor[i][j] = determinant(mini)
-    return minor
+    if expansion:
+        return MinorCache(matrix).minor()
+    return LUFactorization(matrix).minor()
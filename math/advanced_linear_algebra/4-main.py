@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+
+determinant = __import__('0-determinant').determinant
+adjugate = __import__('3-adjugate').adjugate
+inverse = __import__('4-inverse').inverse
+
+
+if __name__ == "__main__":
+    # rounding leaves a pivot of about 1e-16 on this singular matrix,
+    # it must still be reported as singular
+    singular = [[1., 2., 3.], [4., 5., 6.], [7., 8., 9.]]
+    assert inverse(singular) is None, inverse(singular)
+    assert abs(determinant(singular)) < 1e-12, determinant(singular)
+    # entries spanning many magnitudes are not singular
+    for diagonal in ([1e-9, 1e9, 1.], [1e-20, 1., 1.]):
+        scaled = [[value if i == j else 0. for j in range(3)]
+                  for i, value in enumerate(diagonal)]
+        expected = diagonal[0] * diagonal[1] * diagonal[2]
+        assert abs(determinant(scaled) - expected) <= 1e-12 * expected, \
+            determinant(scaled)
+        assert inverse(scaled) is not None, scaled
+    print(inverse(singular), determinant(singular))
+    print(adjugate(singular))
+
+    print(inverse([[2., 1.], [1., 3.]]))
+    print(inverse([[1e-20, 0.], [0., 1e-20]]))
+    print(inverse([[5, 7, 9], [3, 1, 8], [6, 2, 4]]))
@@ -4,25 +4,61 @@
 import numpy as np
 
 
-def definiteness(matrix):
-    """Function that calculates the definiteness of a matrix"""
+def definiteness(matrix, rtol=1e-05, atol=1e-08, tol=0):
+    """Function that calculates the definiteness of a matrix
+
+    matrix may also be a stack of shape (..., n, n): every matrix is
+    classified in one vectorized pass and a numpy.ndarray of labels
+    of shape (...) is returned, with None for non-symmetric matrices.
+    Symmetry is checked within rtol/atol, a Cholesky attempt answers
+    'Positive definite' for a whole stack at once and eigvalsh is used
+    otherwise. Eigenvalues within tol * max|eigenvalue| of 0 count as
+    0; the default 0 compares them with 0 exactly, like the plain
+    eigenvalue test.
+    """
     if type(matrix) is not np.ndarray:
         raise TypeError('matrix must be a numpy.ndarray')
-    if len(matrix.shape) != 2 or matrix.shape[0] != matrix.shape[1]:
-        return None
-    if matrix.shape[0] != matrix.shape[1]:
-        return None
-    transpose = np.transpose(matrix)
-    if not np.array_equal(transpose, matrix):
+    if len(matrix.shape) < 2 or matrix.shape[-1] != matrix.shape[-2]:
         return None
-    ev, _ = np.linalg.eig(matrix)
-    if all(ev < 0):
-        return "Negative definite"
-    if all(ev <= 0):
-        return "Negative semi-definite"
-    if all(ev > 0):
-        return "Positive definite"
-    if all(ev >= 0):
-        return "Positive semi-definite"
-    else:
-        return 'Indefinite'
+    if matrix.shape[-1] == 0:
+        # an empty matrix has no definiteness
+        if len(matrix.shape) == 2:
+            return None
+        return np.full(matrix.shape[:-2], None, dtype=object)
+    stack = matrix.reshape((-1,) + matrix.shape[-2:])
+    transpose = np.swapaxes(stack, -1, -2)
+    symmetric = np.all(np.abs(stack - transpose) <=
+                       atol + rtol * np.abs(transpose), axis=(-1, -2))
+
+    labels = np.full(stack.shape[0], None, dtype=object)
+    if np.any(symmetric):
+        labels[symmetric] = _classify(stack[symmetric], tol)
+    if len(matrix.shape) == 2:
+        return labels[0]
+    return labels.reshape(matrix.shape[:-2])
+
+
+def _classify(stack, tol):
+    """Returns the definiteness labels of a stack of symmetric matrices"""
+    eps = max(stack.shape[-1], 1) * np.finfo(float).eps
+    try:
+        lower = np.linalg.cholesky(stack)
+        pivots = np.diagonal(lower, axis1=-2, axis2=-1) ** 2
+        scale = np.max(np.abs(stack), axis=(-1, -2))
+        # only take the shortcut when every pivot is clear of rounding,
+        # eigvalsh settles the borderline matrices
+        if np.all(np.min(pivots, axis=-1) > eps * scale):
+            return np.full(stack.shape[0], 'Positive definite',
+                           dtype=object)
+    except np.linalg.LinAlgError:
+        pass
+    ev = np.linalg.eigvalsh(stack)
+    threshold = tol * np.max(np.abs(ev), axis=-1, keepdims=True)
+    positive = ev > threshold
+    negative = ev < -threshold
+    labels = np.full(stack.shape[0], 'Indefinite', dtype=object)
+    labels[np.all(~negative, axis=-1)] = 'Positive semi-definite'
+    labels[np.all(positive, axis=-1)] = 'Positive definite'
+    labels[np.all(~positive, axis=-1)] = 'Negative semi-definite'
+    labels[np.all(negative, axis=-1)] = 'Negative definite'
+    return labels
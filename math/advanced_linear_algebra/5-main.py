@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+
+import numpy as np
+definiteness = __import__('5-definiteness').definiteness
+
+
+if __name__ == "__main__":
+    assert definiteness(np.zeros((0, 0))) is None
+    print(definiteness(np.zeros((0, 0))))
+    print(definiteness(np.zeros((2, 0, 0))))
+
+    tiny = np.array([[1, 0], [0, 1e-17]])
+    assert definiteness(tiny) == 'Positive definite', definiteness(tiny)
+    assert definiteness(tiny, tol=1e-15) == 'Positive semi-definite'
+
+    mat1 = np.array([[5, 1], [1, 1]])
+    mat2 = np.array([[2, 4], [4, 8]])
+    mat3 = np.array([[-1, 1], [1, -1]])
+    mat4 = np.array([[-2, 4], [4, -9]])
+    mat5 = np.array([[1, 2], [2, 1]])
+    mat6 = np.array([[1, 2], [3, 4]])
+    stack = np.stack([mat1, mat2, mat3, mat4, mat5, mat6])
+    for mat in stack:
+        print(definiteness(mat))
+    print(definiteness(stack))
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+    O(n^3) determinant and LU factorization engine for lists of lists
+    det = __import__('lu_engine').det
+    LUFactorization = __import__('lu_engine').LUFactorization
+"""
+
+
+from fractions import Fraction
+import sys
+
+
+def is_exact(matrix):
+    """True if every element is an int or a Fraction"""
+    return all(type(value) in (int, Fraction)
+               for row in matrix for value in row)
+
+
+def det_lu(matrix):
+    """
+    Determinant by Gaussian elimination with partial pivoting
+
+    Args:
+        matrix: square list of lists of numbers
+
+    Returns:
+        the determinant as a float
+    """
+    return LUFactorization(matrix, exact=False).det
+
+
+def det_bareiss(matrix):
+    """
+    Fraction-free determinant (Bareiss algorithm)
+
+    Every division is exact, so int matrices give an exact int and
+    Fraction matrices an exact Fraction.
+
+    Args:
+        matrix: square list of lists of ints or Fractions
+
+    Returns:
+        the exact determinant
+    """
+    integral = all(type(value) is int for row in matrix for value in row)
+    if integral:
+        a = [list(row) for row in matrix]
+    else:
+        # int / int would divide as floats, keep every entry a Fraction
+        a = [[Fraction(value) for value in row] for row in matrix]
+    n = len(a)
+    sign = 1
+    previous = 1
+    for k in range(n - 1):
+        if a[k][k] == 0:
+            swap = next((i for i in range(k + 1, n) if a[i][k] != 0), None)
+            if swap is None:
+                return 0
+            a[k], a[swap] = a[swap], a[k]
+            sign = -sign
+        row_k = a[k]
+        diag = row_k[k]
+        for i in range(k + 1, n):
+            row_i = a[i]
+            lead = row_i[k]
+            for j in range(k + 1, n):
+                value = diag * row_i[j] - lead * row_k[j]
+                if integral:
+                    row_i[j] = value // previous
+                else:
+                    row_i[j] = value / previous
+        previous = diag
+    return sign * a[n - 1][n - 1]
+
+
+def det(matrix):
+    """
+    Determinant of a square list of lists, dispatching to the exact
+    Bareiss path for int/Fraction matrices and to LU otherwise
+    """
+    if is_exact(matrix):
+        return det_bareiss(matrix)
+    return det_lu(matrix)
+
+
+class LUFactorization:
+    """
+    PA = LU factorization of a square list of lists, computed once
+
+    The inverse comes from n triangular solves, the adjugate is
+    det * inverse, the cofactor matrix is the transposed adjugate and
+    the minor matrix is the cofactor matrix without its signs. Int and
+    Fraction matrices are factorized with Fractions so every result
+    stays exact; int results are given back as ints.
+    """
+
+    def __init__(self, matrix, exact=None):
+        """
+        Args:
+            matrix: square list of lists of numbers
+            exact: use Fraction arithmetic, decided from the element
+                types if None
+        """
+        if exact is None:
+            exact = is_exact(matrix)
+        self.matrix = matrix
+        self.n = len(matrix)
+        self.exact = exact
+        self.integral = exact and all(type(value) is int
+                                      for row in matrix for value in row)
+        if exact:
+            lu = [[Fraction(value) for value in row] for row in matrix]
+        else:
+            lu = [[float(value) for value in row] for row in matrix]
+        n = self.n
+        perm = list(range(n))
+        det = Fraction(1) if exact else 1.0
+        # rounding leaves tiny pivots where an exact pivot would be 0,
+        # so on floats a pivot within n * eps of the largest entry of
+        # its own row counts as singular; det stays the pivot product
+        scale = [max(abs(value) for value in row) for row in lu]
+        singular = False
+        for k in range(n):
+            if exact:
+                pivot = next((i for i in range(k, n) if lu[i][k] != 0), k)
+            else:
+                pivot = max(range(k, n), key=lambda i: abs(lu[i][k]))
+            if pivot != k:
+                lu[k], lu[pivot] = lu[pivot], lu[k]
+                scale[k], scale[pivot] = scale[pivot], scale[k]
+                perm[k], perm[pivot] = perm[pivot], perm[k]
+                det = -det
+            row_k = lu[k]
+            diag = row_k[k]
+            det *= diag
+            if diag == 0:
+                singular = True
+                break
+            if not exact and (abs(diag) <=
+                              n * sys.float_info.epsilon * scale[k]):
+                singular = True
+            for i in range(k + 1, n):
+                row_i = lu[i]
+                factor = row_i[k] / diag
+                row_i[k] = factor
+                if factor:
+                    for j in range(k + 1, n):
+                        row_i[j] -= factor * row_k[j]
+        self.lu = lu
+        self.perm = perm
+        self._det = det
+        self._singular = singular
+        self._inverse = None
+
+    def _value(self, value):
+        """Converts an internal Fraction back to the input's type"""
+        if self.integral and value.denominator == 1:
+            return int(value)
+        return value
+
+    @property
+    def det(self):
+        """Determinant of the matrix"""
+        if self.exact:
+            return self._value(self._det)
+        return self._det
+
+    @property
+    def singular(self):
+        """
+        True if the matrix has no inverse, for floats up to the
+        row-relative pivot tolerance
+        """
+        return self._singular
+
+    def solve(self, b):
+        """Solves A x = b for a list b, using the stored factors"""
+        lu = self.lu
+        n = self.n
+        y = [b[p] for p in self.perm]
+        for i in range(n):
+            row = lu[i]
+            y[i] -= sum(row[j] * y[j] for j in range(i))
+        for i in range(n - 1, -1, -1):
+            row = lu[i]
+            y[i] = (y[i] - sum(row[j] * y[j]
+                               for j in range(i + 1, n))) / row[i]
+        return y
+
+    def _raw_inverse(self):
+        """Inverse in the internal arithmetic, None if singular"""
+        if self.singular:
+            return None
+        if self._inverse is None:
+            one = Fraction(1) if self.exact else 1.0
+            zero = one * 0
+            columns = [self.solve([one if i == j else zero
+                                   for i in range(self.n)])
+                       for j in range(self.n)]
+            self._inverse = [list(row) for row in zip(*columns)]
+        return self._inverse
+
+    def inverse(self):
+        """Inverse as a list of lists of floats, None if singular"""
+        inverse = self._raw_inverse()
+        if inverse is None:
+            return None
+        if self.integral:
+            return [[float(value) for value in row] for row in inverse]
+        return [list(row) for row in inverse]
+
+    def adjugate(self):
+        """Adjugate matrix, det * inverse or from minors if singular"""
+        inverse = self._raw_inverse()
+        if inverse is None:
+            return [list(row) for row in zip(*self._singular_cofactor())]
+        det = self._det
+        return [[self._value(det * value) if self.exact else det * value
+                 for value in row] for row in inverse]
+
+    def cofactor(self):
+        """Cofactor matrix, the transposed adjugate"""
+        return [list(row) for row in zip(*self.adjugate())]
+
+    def minor(self):
+        """Minor matrix, the cofactor matrix without its signs"""
+        return [[-value if (i + j) % 2 else value
+                 for j, value in enumerate(row)]
+                for i, row in enumerate(self.cofactor())]
+
+    def _singular_cofactor(self):
+        """Cofactors from the O(n^3) determinant of every minor"""
+        matrix = self.matrix
+        n = self.n
+        cofactor = []
+        for i in range(n):
+            rows = matrix[:i] + matrix[i + 1:]
+            line = []
+            for j in range(n):
+                value = det([row[:j] + row[j + 1:] for row in rows])
+                line.append(-value if (i + j) % 2 else value)
+            cofactor.append(line)
+        return cofactor
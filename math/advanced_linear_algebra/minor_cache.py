@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+    Memoized cofactor expansion over one immutable base matrix
+    MinorCache = __import__('minor_cache').MinorCache
+"""
+
+
+from collections import OrderedDict
+
+
+class MinorCache:
+    """
+    Exact cofactor expansion with memoized sub-determinants
+
+    A sub-matrix of the base is identified by the frozensets of its
+    removed rows and columns. Expanding along the first remaining row
+    reaches the same sub-matrix from many branches, so every
+    determinant is computed once and kept in an LRU table, which turns
+    the O(n!) expansion into O(n * 2^n) work.
+    """
+
+    def __init__(self, matrix, maxsize=1 << 21):
+        """
+        Args:
+            matrix: square list of lists, copied into tuples so the
+                cached values cannot go stale
+            maxsize: maximum number of cached sub-determinants
+        """
+        self.matrix = tuple(tuple(row) for row in matrix)
+        self.n = len(self.matrix)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def cache_info(self):
+        """Returns the hit/miss counters and the table size"""
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._cache), 'maxsize': self.maxsize}
+
+    def det(self, rows=frozenset(), cols=frozenset()):
+        """
+        Determinant of the base without the given rows and columns
+
+        Args:
+            rows: frozenset of removed row indices
+            cols: frozenset of removed column indices, same size
+
+        Returns:
+            the exact determinant of the sub-matrix
+        """
+        key = (rows, cols)
+        cache = self._cache
+        if key in cache:
+            self.hits += 1
+            cache.move_to_end(key)
+            return cache[key]
+        self.misses += 1
+
+        n = self.n
+        if len(rows) == n:
+            value = 1
+        else:
+            r = next(i for i in range(n) if i not in rows)
+            line = self.matrix[r]
+            below = rows | {r}
+            value = 0
+            sign = 1
+            for c in range(n):
+                if c in cols:
+                    continue
+                if line[c]:
+                    value += sign * line[c] * self.det(below, cols | {c})
+                sign = -sign
+
+        cache[key] = value
+        if len(cache) > self.maxsize:
+            cache.popitem(last=False)
+        return value
+
+    def minor(self):
+        """Minor matrix of the base"""
+        return [[self.det(frozenset((i,)), frozenset((j,)))
+                 for j in range(self.n)] for i in range(self.n)]
+
+    def cofactor(self):
+        """Cofactor matrix of the base"""
+        return [[-value if (i + j) % 2 else value
+                 for j, value in enumerate(row)]
+                for i, row in enumerate(self.minor())]
@@ -7,43 +7,26 @@ probabilities of developing severe side effects
 
 
 import numpy as np
+check_trials = __import__('bayes_engine').check_trials
+check_hypotheses = __import__('bayes_engine').check_hypotheses
+log_likelihood = __import__('bayes_engine').log_likelihood
 
 
 def likelihood(x, n, P):
     """
     Args:
-        x is the number of patients that develop severe side effects
-        n is the total number of patients observed
+        x is the number of patients that develop severe side effects,
+        an int or a numpy.ndarray of ints for a batch of trials
+        n is the total number of patients observed, an int or a
+        numpy.ndarray of ints broadcastable with x
         P is a 1D numpy.ndarray of length equal to the
         number of patients that develop severe side effects
 
     Returns:
-        the likelihood of obtaining x and n
+        the likelihood of obtaining x and n, with one row per trial
+        (shape x.shape + P.shape) for a batch
     """
-    # Check if n is a positive integer
-    if not isinstance(n, int) or n <= 0:
-        raise ValueError("n must be a positive integer")
-
-    # Check if x is an integer and greater than or equal to 0
-    if not isinstance(x, int) or x < 0:
-        raise ValueError(
-            "x must be an integer that is greater than or equal to 0"
-        )
-
-    # check if x is greater than n
-    if x > n:
-        raise ValueError("x cannot be greater than n")
-
-    # Check if p is a 1D numpy.ndarray
-    if not isinstance(P, np.ndarray) or len(P.shape) != 1:
-        raise TypeError("P must be a 1D numpy.ndarray")
-
-    # Check if all values in p are in the range [0, 1]
-    if np.any((P < 0) | (P > 1)):
-        raise ValueError("All values in P must be in the range [0, 1]")
-
-    # Calculate the combination using np.math.factorial
-    factorial = np.math.factorial
-    fact_coefficient = factorial(n) / (factorial(n - x) * factorial(x))
-    likelihood = fact_coefficient * (P ** x) * ((1 - P) ** (n - x))
-    return likelihood
+    check_trials(x, n)
+    check_hypotheses(P)
+    # log-space binomial likelihood, one row per trial for a batch
+    return np.exp(log_likelihood(x, n, P))
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+    Vectorized validation and log-space binomial likelihoods shared by
+    the bayesian_prob functions
+    check_trials = __import__('bayes_engine').check_trials
+    check_hypotheses = __import__('bayes_engine').check_hypotheses
+    log_choose = __import__('bayes_engine').log_choose
+    log_likelihood = __import__('bayes_engine').log_likelihood
+    log_grid = __import__('bayes_engine').log_grid
+    log_sum = __import__('bayes_engine').log_sum
+    beta_cdf = __import__('bayes_engine').beta_cdf
+    beta_ppf = __import__('bayes_engine').beta_ppf
+    kronrod = __import__('bayes_engine').kronrod
+"""
+
+
+from math import exp, lgamma, log, log1p
+import numpy as np
+
+
+"""lgamma applied element-wise, as an object array"""
+_lgamma = np.frompyfunc(lgamma, 1, 1)
+
+"""Limits of the incomplete beta continued fraction and of the
+bisection of its inverse"""
+BETA_MAX_TERMS = 10000
+BETA_BISECTIONS = 60
+
+"""Gauss-Kronrod 7-15 rule on [-1, 1]: the positive Kronrod nodes,
+their weights and the weights of the embedded 7-point Gauss rule"""
+_KRONROD_X = (0.991455371120812639206854697526329,
+              0.949107912342758524526189684047851,
+              0.864864423359769072789712788640926,
+              0.741531185599394439863864773280788,
+              0.586087235467691130294144845693013,
+              0.405845151377397166906606412076961,
+              0.207784955007898467600689403773245)
+_KRONROD_W = (0.022935322010529224963732008058970,
+              0.063092092629978553290700663189204,
+              0.104790010322250183839876322541518,
+              0.140653259715525918745189590510238,
+              0.169004726639267902826583426598550,
+              0.190350578064785409913256402421014,
+              0.204432940075298892414161999234649)
+_GAUSS_W = (0.129484966168869693270611432679082,
+            0.279705391489276667901467771423780,
+            0.381830050505118944950369775488975)
+KRONROD_NODES = np.concatenate((np.negative(_KRONROD_X), [0.],
+                                _KRONROD_X[::-1]))
+KRONROD_WEIGHTS = np.concatenate((_KRONROD_W,
+                                  [0.209482141084727828012999174891714],
+                                  _KRONROD_W[::-1]))
+GAUSS_WEIGHTS = np.zeros(15)
+GAUSS_WEIGHTS[1::2] = _GAUSS_W + (0.417959183673469387755102040816327,) + \
+    _GAUSS_W[::-1]
+
+
+def _is_integer(value):
+    """True for an int or a numpy.ndarray of integers"""
+    if isinstance(value, np.ndarray):
+        return np.issubdtype(value.dtype, np.integer)
+    return isinstance(value, int)
+
+
+def check_trials(x, n):
+    """
+    Validates the observed data
+
+    Args:
+        x: number of patients that develop severe side effects, an
+            int or a numpy.ndarray of ints for a batch of trials
+        n: total number of patients observed, an int or a
+            numpy.ndarray of ints broadcastable with x
+
+    Raises:
+        ValueError with the messages of the original checks
+    """
+    if type(x) is int and type(n) is int and 0 <= x <= n and n > 0:
+        # fast path for a single valid trial
+        return
+    if not _is_integer(n) or np.any(n <= 0):
+        raise ValueError("n must be a positive integer")
+    if not _is_integer(x) or np.any(x < 0):
+        raise ValueError(
+            "x must be an integer that is greater than or equal to 0"
+        )
+    if np.any(x > n):
+        raise ValueError("x cannot be greater than n")
+
+
+def check_hypotheses(P, Pr=None):
+    """
+    Validates the hypothetical probabilities P and their priors Pr
+
+    Errors are reported in the same order as an element by element
+    loop would: the first out of range index wins, P before Pr.
+    """
+    if not isinstance(P, np.ndarray) or len(P.shape) != 1:
+        raise TypeError("P must be a 1D numpy.ndarray")
+    bad_p = (P < 0) | (P > 1)
+    if Pr is None:
+        if np.any(bad_p):
+            raise ValueError("All values in P must be in the range [0, 1]")
+        return
+    if not isinstance(Pr, np.ndarray) or Pr.shape != P.shape:
+        raise TypeError(
+            "Pr must be a numpy.ndarray with the same shape as P"
+        )
+    bad_pr = (Pr < 0) | (Pr > 1)
+    if np.any(bad_p) or np.any(bad_pr):
+        if not np.any(bad_pr) or (np.any(bad_p) and
+                                  np.argmax(bad_p) <= np.argmax(bad_pr)):
+            raise ValueError("All values in P must be in the range [0, 1]")
+        raise ValueError("All values in Pr must be in the range [0, 1]")
+    if not np.isclose(np.sum(Pr), 1):
+        raise ValueError("Pr must sum to 1")
+
+
+def log_choose(x, n):
+    """log(n choose x) for ints, or element-wise for numpy.ndarrays"""
+    if isinstance(x, np.ndarray) or isinstance(n, np.ndarray):
+        x, n = np.broadcast_arrays(x, n)
+        return np.asarray(_lgamma(n + 1) - _lgamma(x + 1) -
+                          _lgamma(n - x + 1), dtype=float)
+    return lgamma(n + 1) - lgamma(x + 1) - lgamma(n - x + 1)
+
+
+def log_likelihood(x, n, P):
+    """
+    Log of the binomial likelihood of x successes in n trials for
+    every hypothetical probability in P
+
+    Args:
+        x, n: ints, or numpy.ndarrays broadcastable together
+        P: 1D numpy.ndarray of probabilities
+
+    Returns:
+        numpy.ndarray of shape broadcast(x, n).shape + P.shape
+    """
+    coefficient = log_choose(x, n)
+    if isinstance(coefficient, np.ndarray):
+        coefficient = coefficient[..., np.newaxis]
+        x, n = np.broadcast_arrays(x, n)
+        x = x[..., np.newaxis]
+        n = n[..., np.newaxis]
+    with np.errstate(divide='ignore'):
+        log_p = np.log(P)
+        log_q = np.log1p(-P)
+    return coefficient + log_grid(x, n - x, log_p, log_q)
+
+
+def log_grid(successes, failures, log_p, log_q):
+    """
+    successes * log(P) + failures * log(1 - P), where a count of 0
+    contributes 0 even at P = 0 or 1
+
+    Args:
+        successes, failures: counts, numbers or numpy.ndarrays
+        log_p, log_q: log(P) and log(1 - P) of the grid
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (np.where(successes == 0, 0., successes * log_p) +
+                np.where(failures == 0, 0., failures * log_q))
+
+
+def log_sum(log_values):
+    """log(sum(exp(log_values))) over the last axis, without underflow"""
+    peak = np.max(log_values, axis=-1, keepdims=True)
+    peak = np.where(np.isfinite(peak), peak, 0.)
+    with np.errstate(divide='ignore'):
+        return (np.log(np.sum(np.exp(log_values - peak), axis=-1)) +
+                peak[..., 0])
+
+
+def log_beta(a, b):
+    """log of the Beta function B(a, b)"""
+    return lgamma(a) + lgamma(b) - lgamma(a + b)
+
+
+def _beta_fraction(a, b, x):
+    """Continued fraction of the incomplete beta function (Lentz)"""
+    tiny = 1e-300
+    c = 1.
+    d = 1 - (a + b) * x / (a + 1)
+    d = 1 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, BETA_MAX_TERMS + 1):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x /
+                          ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1 + numerator * d
+            d = 1 / (d if abs(d) > tiny else tiny)
+            c = 1 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= d * c
+        if abs(d * c - 1) < 1e-15:
+            break
+    return result
+
+
+def beta_cdf(x, a, b):
+    """Regularized incomplete beta function I_x(a, b), the Beta CDF"""
+    if x <= 0:
+        return 0.
+    if x >= 1:
+        return 1.
+    front = exp(a * log(x) + b * log1p(-x) - log_beta(a, b))
+    # the fraction converges fast on the side of the mean it is used
+    if x < (a + 1) / (a + b + 2):
+        return front * _beta_fraction(a, b, x) / a
+    return 1 - front * _beta_fraction(b, a, 1 - x) / b
+
+
+def beta_ppf(q, a, b):
+    """Quantile of the Beta(a, b) distribution, by bisection on beta_cdf"""
+    low = 0.
+    high = 1.
+    for _ in range(BETA_BISECTIONS):
+        middle = (low + high) / 2
+        if beta_cdf(middle, a, b) < q:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def kronrod(values, left, right):
+    """
+    Gauss-Kronrod 7-15 estimate of an integral over [left, right]
+
+    Args:
+        values: integrand at the KRONROD_NODES mapped to the interval
+        left, right: bounds of the interval
+
+    Returns:
+        (integral, error), the error being the difference with the
+        embedded Gauss rule
+    """
+    half = (right - left) / 2
+    integral = half * np.dot(KRONROD_WEIGHTS, values)
+    return integral, abs(integral - half * np.dot(GAUSS_WEIGHTS, values))
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+
+import numpy as np
+posterior = __import__('3-posterior').posterior
+posterior_density = __import__('posterior_density').posterior_density
+beta_cdf = __import__('bayes_engine').beta_cdf
+likelihood = __import__('0-likelihood').likelihood
+
+
+if __name__ == "__main__":
+    try:
+        likelihood(0, 0, np.linspace(0, 1, 11))
+        raise AssertionError("n=0 accepted")
+    except ValueError as error:
+        print(error)
+
+    # with a uniform prior the posterior is Beta(x + 1, n - x + 1)
+    for x, n in [(26, 130), (1, 3), (5000, 100000)]:
+        p1 = x / n - 0.001
+        p2 = x / n + 0.001
+        exact = (beta_cdf(p2, x + 1, n - x + 1) -
+                 beta_cdf(p1, x + 1, n - x + 1))
+        P = np.linspace(0, 1, 100001)
+        grid = posterior(x, n, P, np.full(P.size, 1 / P.size))
+        grid = np.sum(grid[(P >= p1) & (P <= p2)])
+        density = posterior_density(x, n, np.ones_like, 0, 1)
+        adaptive = density.probability(p1, p2)
+        print("x={} n={}: grid {} evaluations error {:.1e}, adaptive {} "
+              "evaluations error {:.1e}".format(
+                  x, n, P.size, abs(grid - exact), density.evaluations,
+                  abs(adaptive - exact)))
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+    Posterior of the probability of developing severe side effects
+    for a continuous prior, by adaptive quadrature
+    posterior_density = __import__('posterior_density').posterior_density
+    PosteriorDensity = __import__('posterior_density').PosteriorDensity
+"""
+
+
+import heapq
+from math import fsum, sqrt
+import numpy as np
+engine = __import__('bayes_engine')
+
+
+"""Relative accuracy targeted by the adaptive quadrature, and the
+largest number of 15-point panels it may use per integral"""
+QUADRATURE_TOLERANCE = 1e-10
+QUADRATURE_MAX_PANELS = 200
+
+"""Distances from the likelihood mode, in standard deviations, at
+which the support is split before refining"""
+MODE_SPLITS = (1, 3, 6, 12, 24)
+
+
+class PosteriorDensity:
+    """
+    Posterior density of P for x successes in n trials and a prior
+    density prior_fn on [a, b]
+
+    The integrand likelihood * prior is scaled by the likelihood at
+    its mode so it never underflows, and the support is first split
+    around the mode at multiples of the binomial standard deviation,
+    so the adaptive Gauss-Kronrod refinement starts where the
+    likelihood mass is. Every panel's integrand values are cached:
+    the marginal, interval probabilities and the mean reuse them
+    instead of evaluating the likelihood again.
+    """
+
+    def __init__(self, x, n, prior_fn, a, b):
+        """
+        Args:
+            x: number of patients that develop severe side effects
+            n: total number of patients observed
+            prior_fn: prior density, a function of a numpy.ndarray of
+                probabilities returning their densities
+            a, b: bounds of the support of the prior, 0 <= a < b <= 1
+        """
+        engine.check_trials(x, n)
+        if not callable(prior_fn):
+            raise TypeError("prior_fn must be callable")
+        if not 0 <= a < b <= 1:
+            raise ValueError("a and b must satisfy 0 <= a < b <= 1")
+        self.x = x
+        self.n = n
+        self.prior_fn = prior_fn
+        self.a = float(a)
+        self.b = float(b)
+        self.evaluations = 0
+        self._panels = {}
+        mode = min(max(x / n, self.a), self.b)
+        self._log_peak = float(engine.log_likelihood(x, n,
+                                                     np.array([mode]))[0])
+        spread = sqrt(max(x * (n - x), 1) / n) / n
+        splits = {self.a, self.b, mode}
+        for distance in MODE_SPLITS:
+            for point in (mode - distance * spread,
+                          mode + distance * spread):
+                if self.a < point < self.b:
+                    splits.add(point)
+        total, self._breaks = self._integrate(sorted(splits))
+        if not total > 0:
+            raise ValueError("the prior has no mass where the data is "
+                             "possible")
+        self.log_marginal = self._log_peak + np.log(total)
+        self._total = total
+
+    @property
+    def marginal(self):
+        """Probability of obtaining x out of n under the prior"""
+        return np.exp(self.log_marginal)
+
+    def _integrand(self, P):
+        """likelihood(P) / likelihood(mode) * prior(P)"""
+        self.evaluations += P.size
+        prior = np.broadcast_to(self.prior_fn(P), P.shape)
+        if np.any(prior < 0):
+            raise ValueError("prior_fn must be non-negative")
+        log_ratio = engine.log_likelihood(self.x, self.n, P) - self._log_peak
+        return np.exp(log_ratio) * prior
+
+    def _panel(self, left, right):
+        """Cached integrand values at the Kronrod nodes of a panel"""
+        values = self._panels.get((left, right))
+        if values is None:
+            middle = (left + right) / 2
+            nodes = middle + (right - left) / 2 * engine.KRONROD_NODES
+            values = self._integrand(nodes)
+            self._panels[(left, right)] = values
+        return values
+
+    def _integrate(self, breaks):
+        """
+        Adaptive integral of the scaled integrand over the panels
+        between consecutive breaks, bisecting the panel with the
+        largest error estimate until the estimates are small enough
+
+        Returns:
+            (integral, breaks of the refined panels)
+        """
+        heap = []
+        for left, right in zip(breaks[:-1], breaks[1:]):
+            integral, error = engine.kronrod(self._panel(left, right),
+                                             left, right)
+            heap.append((-error, left, right, integral))
+        heapq.heapify(heap)
+        total = fsum(panel[3] for panel in heap)
+        error = -fsum(panel[0] for panel in heap)
+        while (error > QUADRATURE_TOLERANCE * abs(total) and
+               len(heap) < QUADRATURE_MAX_PANELS):
+            worst, left, right, integral = heapq.heappop(heap)
+            total -= integral
+            error += worst
+            middle = (left + right) / 2
+            for low, high in ((left, middle), (middle, right)):
+                part, part_error = engine.kronrod(self._panel(low, high),
+                                                  low, high)
+                heapq.heappush(heap, (-part_error, low, high, part))
+                total += part
+                error += part_error
+        breaks = sorted({point for panel in heap for point in panel[1:3]})
+        return fsum(panel[3] for panel in heap), breaks
+
+    def __call__(self, P):
+        """
+        Posterior density at every probability of the numpy.ndarray P,
+        0 outside [a, b]
+        """
+        P = np.asarray(P, dtype=float)
+        inside = (P >= self.a) & (P <= self.b)
+        density = np.zeros(P.shape)
+        density[inside] = (self._integrand(P[inside]) *
+                           np.exp(self._log_peak - self.log_marginal))
+        return density
+
+    def probability(self, p1, p2):
+        """
+        Posterior probability that P is within [p1, p2]
+
+        The panels of the marginal that lie inside [p1, p2] are reused,
+        only the ones cut by p1 or p2 are evaluated again.
+        """
+        if not 0 <= p1 <= 1:
+            raise ValueError("p1 must be a float in the range [0, 1]")
+        if not 0 <= p2 <= 1:
+            raise ValueError("p2 must be a float in the range [0, 1]")
+        if p2 <= p1:
+            raise ValueError("p2 must be greater than p1")
+        low = max(p1, self.a)
+        high = min(p2, self.b)
+        if high <= low:
+            return 0.
+        breaks = [low] + [point for point in self._breaks
+                          if low < point < high] + [high]
+        return min(self._integrate(breaks)[0] / self._total, 1.)
+
+    def cdf(self, p):
+        """Posterior probability that P <= p"""
+        if p <= self.a:
+            return 0.
+        return self.probability(self.a, min(p, self.b))
+
+    def mean(self):
+        """Posterior mean of P, from the cached panels"""
+        moment = 0.
+        for left, right in zip(self._breaks[:-1], self._breaks[1:]):
+            nodes = (left + right) / 2 + (right - left) / 2 * \
+                engine.KRONROD_NODES
+            moment += engine.kronrod(nodes * self._panel(left, right),
+                                     left, right)[0]
+        return moment / self._total
+
+
+def posterior_density(x, n, prior_fn, a, b):
+    """
+    Args:
+        x is the number of patients that develop severe side effects
+        n is the total number of patients observed
+        prior_fn is the prior density, a function of a numpy.ndarray
+        of probabilities
+        a and b are the bounds of the support of the prior
+
+    Returns:
+        the posterior as a PosteriorDensity: call it for the density,
+        use probability(p1, p2), cdf, mean and marginal for the rest
+    """
+    return PosteriorDensity(x, n, prior_fn, a, b)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+    Incremental posterior over the probability of developing severe
+    side effects, updated as batches of patients arrive
+    PosteriorTracker = __import__('posterior_tracker').PosteriorTracker
+"""
+
+
+import numpy as np
+engine = __import__('bayes_engine')
+
+
+class PosteriorTracker:
+    """
+    Posterior of the probability of a side effect, batch by batch
+
+    The binomial likelihood of several batches factorizes into the
+    product of their binomial coefficients times P^s * (1 - P)^f,
+    where s and f are the total successes and failures. The tracker
+    keeps only s, f and the sum of the log coefficients, so update
+    is O(1), and the posterior, marginal and credible intervals are
+    computed on demand in O(len(P)) in log space.
+
+    With a grid prior (P, Pr) the posterior lives on the grid. With a
+    Beta(alpha, beta) prior it is Beta(alpha + s, beta + f) in closed
+    form (Beta-Binomial model).
+    """
+
+    def __init__(self, P=None, Pr=None, alpha=None, beta=None):
+        """
+        Args:
+            P: 1D numpy.ndarray of hypothetical probabilities
+            Pr: 1D numpy.ndarray of the prior beliefs of P
+            alpha, beta: parameters of a Beta prior, used instead of
+                P and Pr when P is None
+        """
+        if P is None:
+            if alpha is None or beta is None or alpha <= 0 or beta <= 0:
+                raise ValueError("alpha and beta must be positive")
+            self.alpha = float(alpha)
+            self.beta = float(beta)
+        else:
+            engine.check_hypotheses(P, Pr)
+            with np.errstate(divide='ignore'):
+                self._log_prior = np.log(Pr)
+                self._log_p = np.log(P)
+                self._log_q = np.log1p(-P)
+        self.P = P
+        self.Pr = Pr
+        self.successes = 0
+        self.failures = 0
+        self.log_coefficients = 0.
+
+    @property
+    def conjugate(self):
+        """True for a Beta prior, False for a grid prior"""
+        return self.P is None
+
+    def update(self, x, n):
+        """
+        Folds in a batch of x patients with side effects out of n
+
+        Args:
+            x, n: ints, or numpy.ndarrays of ints for several batches
+
+        Returns:
+            the tracker
+        """
+        engine.check_trials(x, n)
+        if isinstance(x, np.ndarray) or isinstance(n, np.ndarray):
+            x, n = np.broadcast_arrays(x, n)
+            self.successes += int(np.sum(x))
+            self.failures += int(np.sum(n - x))
+            self.log_coefficients += float(np.sum(engine.log_choose(x, n)))
+        else:
+            self.successes += x
+            self.failures += n - x
+            self.log_coefficients += engine.log_choose(x, n)
+        return self
+
+    def params(self):
+        """Returns (alpha, beta) of the Beta posterior"""
+        if not self.conjugate:
+            raise ValueError("params needs a Beta prior")
+        return self.alpha + self.successes, self.beta + self.failures
+
+    def _log_joint(self):
+        """log(prior * P^s * (1 - P)^f) on the grid"""
+        return self._log_prior + engine.log_grid(
+            self.successes, self.failures, self._log_p, self._log_q)
+
+    def posterior(self, P=None):
+        """
+        Posterior given every batch so far
+
+        Args:
+            P: with a Beta prior, numpy.ndarray of probabilities at
+                which to evaluate the posterior density; unused with
+                a grid prior
+
+        Returns:
+            the posterior probability of each grid point of P, or the
+            posterior density at P for a Beta prior
+        """
+        if not self.conjugate:
+            log_joint = self._log_joint()
+            return np.exp(log_joint - engine.log_sum(log_joint))
+        if P is None:
+            raise TypeError("P must be a numpy.ndarray")
+        alpha, beta = self.params()
+        with np.errstate(divide='ignore'):
+            log_density = engine.log_grid(alpha - 1, beta - 1, np.log(P),
+                                          np.log1p(-P))
+        return np.exp(log_density - engine.log_beta(alpha, beta))
+
+    def marginal(self):
+        """Probability of obtaining every batch observed so far"""
+        if not self.conjugate:
+            return np.exp(self.log_coefficients +
+                          engine.log_sum(self._log_joint()))
+        alpha, beta = self.params()
+        return np.exp(self.log_coefficients +
+                      engine.log_beta(alpha, beta) -
+                      engine.log_beta(self.alpha, self.beta))
+
+    def mean(self):
+        """Posterior mean of the probability of a side effect"""
+        if not self.conjugate:
+            return float(np.sum(self.P * self.posterior()))
+        alpha, beta = self.params()
+        return alpha / (alpha + beta)
+
+    def credible_interval(self, mass=0.95):
+        """
+        Equal-tailed credible interval
+
+        Args:
+            mass: posterior probability inside the interval
+
+        Returns:
+            (low, high); with a grid prior, the first grid points at
+            which the posterior CDF reaches (1 - mass) / 2 and
+            (1 + mass) / 2
+        """
+        if not 0 < mass < 1:
+            raise ValueError("mass must be between 0 and 1")
+        tail = (1 - mass) / 2
+        if self.conjugate:
+            alpha, beta = self.params()
+            return (engine.beta_ppf(tail, alpha, beta),
+                    engine.beta_ppf(1 - tail, alpha, beta))
+        order = np.argsort(self.P)
+        points = self.P[order]
+        cdf = np.cumsum(self.posterior()[order])
+        low, high = np.searchsorted(cdf, (tail, 1 - tail))
+        return points[low], points[min(high, len(points) - 1)]
@@ -6,10 +6,12 @@
 """
 
 
-import numpy as np
+conv2d_grayscale = __import__('conv_engine').conv2d_grayscale
 
 
-def convolve_grayscale(images, kernel, padding="same", stride=(1, 1)):
+def convolve_grayscale(images, kernel, padding='same', stride=(1, 1),
+                       algorithm='im2col', out=None, max_memory=None,
+                       workers=1):
     """
     A function def convolve_grayscale(images, kernel,
         padding='same', stride=(1, 1)):
@@ -35,38 +37,37 @@ def convolve_grayscale(images, kernel, padding="same", stride=(1, 1)):
         stride is a tuple of (sh, sw)
         sh is the stride for the height of the image
         sw is the stride for the width of the image
+        algorithm is 'im2col', 'direct', 'fft', 'winograd' or 'auto'
+        'im2col' (the default) and 'direct' add up each window in
+        another order than a plain window loop, so float results can
+        differ from the loop by rounding (about 1e-14) while integer
+        results are exact; 'fft' and 'winograd' add somewhat larger
+        rounding noise on floats
+        'auto' lets the cost model of conv_engine pick the backend,
+        which can be 'fft' or 'winograd' for float inputs; the choice
+        and its timing are recorded in conv_engine.audit_log
+        out, max_memory and workers split the batch into tiles padded
+        on the fly (see conv_engine.conv2d_batched):
+        out is a preallocated (m, ch, cw) array or a .npy path to
+        create as a memmap, max_memory caps the working memory in
+        bytes and workers is the number of threads
 
     Returns:
         a numpy.ndarray containing the convolved images
     """
-    m = images.shape[0]
     height = images.shape[1]
     width = images.shape[2]
     kh = kernel.shape[0]
     kw = kernel.shape[1]
     sh, sw = stride
-    if padding == "same":
+    if padding == 'same':
         ph = int(((height - 1) * stride[0] + kh - height) / 2) + 1
         pw = int(((width - 1) * stride[1] + kw - width) / 2) + 1
-    elif padding == "valid":
+    elif padding == 'valid':
         ph = 0
         pw = 0
     else:
         ph = padding[0]
         pw = padding[1]
-    images = np.pad(images, ((0, 0), (ph, ph), (pw, pw)),
-                    "constant", constant_values=0)
-    ch = ((height + (2 * ph) - kh) // sh) + 1
-    cw = ((width + (2 * pw) - kw) // sw) + 1
-    convolved_image = np.zeros((m, ch, cw))
-
-    i = 0
-    for h in range(0, (height + (2 * ph) - kh + 1), sh):
-        j = 0
-        for w in range(0, (width + (2 * pw) - kw + 1), sw):
-            output = np.sum(images[:, h:h + kh, w:w + kw] *
-                            kernel, axis=1).sum(axis=1)
-            convolved_image[:, i, j] = output
-            j += 1
-        i += 1
-    return convolved_image
+    return conv2d_grayscale(images, kernel, ph, pw, sh, sw, algorithm,
+                            out, max_memory, workers)
@@ -7,9 +7,14 @@
 
 
 import numpy as np
+conv2d_auto = __import__('conv_engine').conv2d_auto
+conv2d_batched = __import__('conv_engine').conv2d_batched
+open_output = __import__('conv_engine').open_output
 
 
-def convolve_channels(images, kernel, padding='same', stride=(1, 1)):
+def convolve_channels(images, kernel, padding='same', stride=(1, 1),
+                      algorithm='im2col', out=None, max_memory=None,
+                      workers=1):
     """
     Performs a convolution on images with multiple channels
     using given padding and stride
@@ -34,6 +39,21 @@ def convolve_channels(images, kernel, padding='same', stride=(1, 1)):
         stride [tuple of (sh, sw)]:
             sh: stride for the height of the image
             sw: stride for the width of the image
+        algorithm ['im2col', 'direct', 'fft', 'winograd' or 'auto']:
+            'im2col' (the default) and 'direct' add up each window in
+            another order than a plain window loop, so float results
+            can differ from the loop by rounding (about 1e-14) while
+            integer results are exact; 'fft' and 'winograd' add
+            somewhat larger rounding noise on floats
+            'auto' lets the cost model of conv_engine pick the backend,
+            which can be 'fft' or 'winograd' for float inputs; the choice
+            and its timing are recorded in conv_engine.audit_log
+        out [numpy.ndarray of shape (m, ch, cw) or path to a .npy file]:
+            receives the result, a path is created as a memmap
+        max_memory [int]: cap in bytes on the working memory
+        workers [int]: number of threads
+            any of out, max_memory or workers > 1 splits the batch into
+            tiles padded on the fly (see conv_engine.conv2d_batched)
 
     if needed, images should be padded with 0s
     function may only use two for loops maximum and no other loops are allowed
@@ -52,16 +72,13 @@ def convolve_channels(images, kernel, padding='same', stride=(1, 1)):
         pw = 0
     else:
         ph, pw = padding
-    images = np.pad(images, ((0, 0), (ph, ph), (pw, pw), (0, 0)),
-                    'constant', constant_values=0)
+    kernel = kernel[..., np.newaxis]
+    if out is None and max_memory is None and workers == 1:
+        convoluted = conv2d_auto(images, kernel, ph, pw, sh, sw, algorithm)
+        return convoluted[..., 0]
     ch = ((height + (2 * ph) - kh) // sh) + 1
     cw = ((width + (2 * pw) - kw) // sw) + 1
-    convoluted = np.zeros((m, ch, cw))
-
-    for i, h in enumerate(range(0, (height + (2 * ph) - kh + 1), sh)):
-        for j, w in enumerate(range(0, (width + (2 * pw) - kw + 1), sw)):
-            output = np.sum(images[:, h: h + kh, w: w + kw, :] * kernel,
-                            axis=(1, 2, 3))
-            convoluted[:, i, j] = output
-
-    return convoluted
+    out = open_output(out, (m, ch, cw))
+    conv2d_batched(images, kernel, ph, pw, sh, sw, out[..., np.newaxis],
+                   max_memory, workers, algorithm)
+    return out
@@ -6,10 +6,13 @@
 '''
 
 
-import numpy as np
+BACKENDS = __import__('conv_engine').BACKENDS
+conv2d_batched = __import__('conv_engine').conv2d_batched
+gemm_algorithm = __import__('conv_engine').gemm_algorithm
 
 
-def convolve(images, kernels, padding='same', stride=(1, 1)):
+def convolve(images, kernels, padding='same', stride=(1, 1), out=None,
+             max_memory=None, workers=1):
     """
     Performs a convolution on images with multiple channels
     using given padding and stride
@@ -35,6 +38,16 @@ def convolve(images, kernels, padding='same', stride=(1, 1)):
         stride [tuple of (sh, sw)]:
             sh: stride for the height of the image
             sw: stride for the width of the image
+        out [numpy.ndarray of shape (m, ch, cw, nc) or path to a .npy]:
+            receives the result, a path is created as a memmap
+        max_memory [int]: cap in bytes on the working memory
+        workers [int]: number of threads
+            any of out, max_memory or workers > 1 splits the batch into
+            tiles padded on the fly (see conv_engine.conv2d_batched)
+
+    3x3 kernels at stride (1, 1) on floating point images go through
+    the Winograd F(2x2, 3x3) backend when the cost model expects it to
+    beat im2col (see conv_engine.gemm_algorithm)
 
     if needed, images should be padded with 0s
     function may only use two for loops maximum and no other loops are allowed
@@ -45,26 +58,16 @@ def convolve(images, kernels, padding='same', stride=(1, 1)):
     m, height, width, c = images.shape
     kh, kw, kc, nc = kernels.shape
     sh, sw = stride
-    if padding is 'same':
+    if padding == 'same':
         ph = ((((height - 1) * sh) + kh - height) // 2) + 1
         pw = ((((width - 1) * sw) + kw - width) // 2) + 1
-    elif padding is 'valid':
+    elif padding == 'valid':
         ph = 0
         pw = 0
     else:
         ph, pw = padding
-    images = np.pad(images, ((0, 0), (ph, ph), (pw, pw), (0, 0)),
-                    'constant', constant_values=0)
-    ch = ((height + (2 * ph) - kh) // sh) + 1
-    cw = ((width + (2 * pw) - kw) // sw) + 1
-    convoluted = np.zeros((m, ch, cw, nc))
-
-    for index in range(nc):
-        kernel_index = kernels[:, :, :, index]
-        for i, h in enumerate(range(0, (height + (2 * ph) - kh + 1), sh)):
-            for j, w in enumerate(range(0, (width + (2 * pw) - kw + 1), sw)):
-                output = np.sum(images[:, h: h + kh, w: w + kw, :]
-                                * kernel_index, axis=(1, 2, 3))
-                convoluted[:, i, j, index] = output
-
-    return convoluted
+    algorithm = gemm_algorithm(images, kernels, ph, pw, sh, sw)
+    if out is None and max_memory is None and workers == 1:
+        return BACKENDS[algorithm](images, kernels, ph, pw, sh, sw)
+    return conv2d_batched(images, kernels, ph, pw, sh, sw, out, max_memory,
+                          workers, algorithm)
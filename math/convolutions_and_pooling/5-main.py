@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import time
+import numpy as np
+convolve = __import__('5-convolve').convolve
+conv2d_direct = __import__('conv_engine').conv2d_direct
+conv2d_auto = __import__('conv_engine').conv2d_auto
+audit_log = __import__('conv_engine').audit_log
+BACKENDS = __import__('conv_engine').BACKENDS
+winograd_applies = __import__('conv_engine').winograd_applies
+conv2d_winograd = __import__('conv_engine').conv2d_winograd
+
+
+def loop_convolve(images, kernels, padding='same', stride=(1, 1)):
+    """Convolves with one numpy sum per output window"""
+    m, height, width, c = images.shape
+    kh, kw, kc, nc = kernels.shape
+    sh, sw = stride
+    if padding == 'same':
+        ph = ((((height - 1) * sh) + kh - height) // 2) + 1
+        pw = ((((width - 1) * sw) + kw - width) // 2) + 1
+    elif padding == 'valid':
+        ph = 0
+        pw = 0
+    else:
+        ph, pw = padding
+    images = np.pad(images, ((0, 0), (ph, ph), (pw, pw), (0, 0)),
+                    'constant', constant_values=0)
+    ch = ((height + (2 * ph) - kh) // sh) + 1
+    cw = ((width + (2 * pw) - kw) // sw) + 1
+    convoluted = np.zeros((m, ch, cw, nc))
+    for index in range(nc):
+        kernel_index = kernels[:, :, :, index]
+        for i, h in enumerate(range(0, (height + (2 * ph) - kh + 1), sh)):
+            for j, w in enumerate(range(0, (width + (2 * pw) - kw + 1), sw)):
+                convoluted[:, i, j, index] = np.sum(
+                    images[:, h: h + kh, w: w + kw, :] * kernel_index,
+                    axis=(1, 2, 3))
+    return convoluted
+
+
+if __name__ == "__main__":
+    np.random.seed(0)
+    cases = [
+        ((8, 32, 32, 3), (3, 3, 3, 16), 'same', (1, 1), float),
+        ((8, 64, 64, 3), (5, 5, 3, 32), 'valid', (2, 2), float),
+        ((4, 224, 224, 3), (3, 3, 3, 64), 'same', (1, 1), float),
+        ((8, 28, 28, 3), (5, 5, 3, 8), (1, 2), (1, 1), int),
+    ]
+    for image_shape, kernel_shape, padding, stride, dtype in cases:
+        images = np.random.randn(*image_shape)
+        kernels = np.random.randn(*kernel_shape)
+        if dtype is int:
+            images = np.random.randint(-9, 10, image_shape)
+            kernels = np.random.randint(-9, 10, kernel_shape)
+        start = time.perf_counter()
+        fast = convolve(images, kernels, padding, stride)
+        fast_time = time.perf_counter() - start
+        start = time.perf_counter()
+        slow = loop_convolve(images, kernels, padding, stride)
+        slow_time = time.perf_counter() - start
+        print("{} * {} {} {}: loop {:.3f}s, engine {:.3f}s ({:.1f}x), "
+              "max abs diff {:.2e}".format(image_shape, kernel_shape,
+                                           padding, stride, slow_time,
+                                           fast_time, slow_time / fast_time,
+                                           np.max(np.abs(fast - slow))))
+        # integer sums are exact, float sums may differ by rounding
+        if dtype is int:
+            assert np.array_equal(fast, slow), image_shape
+        else:
+            assert np.allclose(fast, slow), image_shape
+
+    # compare the backend picked by the cost model with the fastest one
+    for image_shape, kernel_shape, pad, step in [
+            ((8, 64, 64, 3), (7, 7, 3, 16), 3, 2),
+            ((5, 17, 14, 3), (3, 3, 3, 1), 1, 1),
+            ((2, 50, 50, 64), (3, 3, 64, 64), 1, 1),
+            ((4, 128, 128, 1), (21, 21, 1, 1), 0, 1)]:
+        images = np.random.randn(*image_shape)
+        kernels = np.random.randn(*kernel_shape)
+        conv2d_auto(images, kernels, pad, pad, step, step)
+        picked = audit_log[-1]['algorithm']
+        seconds = {}
+        for algorithm, backend in BACKENDS.items():
+            if (algorithm == 'winograd' and
+                    not winograd_applies(images, kernels, step, step)):
+                continue
+            best = float('inf')
+            for _ in range(5):
+                start = time.perf_counter()
+                backend(images, kernels, pad, pad, step, step)
+                best = min(best, time.perf_counter() - start)
+            seconds[algorithm] = best
+        fastest = min(seconds, key=seconds.get)
+        print("auto {} * {}: picked {} {:.2f}ms, fastest {} {:.2f}ms"
+              .format(image_shape, kernel_shape, picked,
+                      1000 * seconds[picked], fastest,
+                      1000 * seconds[fastest]))
+
+    # Winograd accuracy against the direct method
+    for image_shape, kernel_shape, scale in [
+            ((4, 32, 32, 3), (3, 3, 3, 16), 1),
+            ((2, 33, 31, 64), (3, 3, 64, 32), 1),
+            ((2, 28, 28, 128), (3, 3, 128, 64), 1000)]:
+        images = np.random.randn(*image_shape) * scale
+        kernels = np.random.randn(*kernel_shape)
+        direct = conv2d_direct(images, kernels, 1, 1, 1, 1)
+        start = time.perf_counter()
+        winograd = conv2d_winograd(images, kernels, 1, 1, 1, 1)
+        winograd_time = time.perf_counter() - start
+        error = np.abs(winograd - direct)
+        print("winograd {} * {}: {:.3f}s, max abs error {:.2e}, "
+              "max rel error {:.2e}".format(
+                  image_shape, kernel_shape, winograd_time, np.max(error),
+                  np.max(error) / np.max(np.abs(direct))))
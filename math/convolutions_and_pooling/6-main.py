@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+import time
+import numpy as np
+convolve = __import__('5-convolve').convolve
+pool = __import__('6-pool').pool
+Conv2D = __import__('layer_plans').Conv2D
+Pool2D = __import__('layer_plans').Pool2D
+
+
+def repeat(func, batches):
+    """Returns the seconds func takes over all the batches"""
+    start = time.perf_counter()
+    for batch in batches:
+        func(batch)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    np.random.seed(0)
+    image_shape = (32, 28, 28, 8)
+    batches = [np.random.randn(*image_shape) for _ in range(50)]
+    kernels = np.random.randn(3, 3, 8, 16)
+
+    conv = Conv2D(image_shape, kernels.shape, 'same', (1, 1))
+    print("convolve {:.3f}s, Conv2D plan ({}) {:.3f}s".format(
+        repeat(lambda x: convolve(x, kernels), batches), conv.algorithm,
+        repeat(lambda x: conv(x, kernels), batches)))
+    print("max abs diff {:.2e}".format(np.max(np.abs(
+        conv(batches[0], kernels) - convolve(batches[0], kernels)))))
+
+    for kernel_shape, stride, mode in [((2, 2), (2, 2), 'max'),
+                                       ((3, 3), (1, 1), 'max'),
+                                       ((3, 3), (2, 2), 'avg')]:
+        plan = Pool2D(image_shape, kernel_shape, stride, mode, 'same')
+        print("{} pool {} {}: pool {:.3f}s, Pool2D plan {:.3f}s".format(
+            mode, kernel_shape, stride,
+            repeat(lambda x: pool(x, kernel_shape, stride, mode, 'same'),
+                   batches),
+            repeat(plan, batches)))
@@ -4,13 +4,35 @@
     pool(images, kernel_shape, pool_shape, mode='max'):
     that performs a pooling on images:
     mode: max or avg
+    and its backward pass pool_backward
 '''
 
 
 import numpy as np
+windows = __import__('conv_engine').windows
 
 
-def pool(images, kernel_shape, stride, mode='max'):
+def pool_padding(height, width, kh, kw, sh, sw, padding):
+    '''
+        Returns ((top, bottom), (left, right), ch, cw) for padding
+        'valid' or 'same'; 'same' gives ceil(h / sh) x ceil(w / sw)
+        outputs and splits the padding with the extra row/column at
+        the bottom/right
+    '''
+    if padding == 'valid':
+        return (0, 0), (0, 0), (height - kh) // sh + 1, (width - kw) // sw + 1
+    if padding != 'same':
+        raise ValueError("padding must be 'valid' or 'same'")
+    ch = -(-height // sh)
+    cw = -(-width // sw)
+    total_h = max((ch - 1) * sh + kh - height, 0)
+    total_w = max((cw - 1) * sw + kw - width, 0)
+    return ((total_h // 2, total_h - total_h // 2),
+            (total_w // 2, total_w - total_w // 2), ch, cw)
+
+
+def pool(images, kernel_shape, stride, mode='max', padding='valid',
+         return_indices=False):
     '''
         images: numpy.ndarray with shape (m, h, w, c)
             m: number of images
@@ -24,25 +46,98 @@ def pool(images, kernel_shape, stride, mode='max'):
             sh: stride for the height of the image
             sw: stride for the width of the image
         mode: max or avg
-        Returns: numpy.ndarray containing the pooled images
+        padding: 'valid' or 'same'; 'same' pads with -inf for max and
+            leaves the padded cells out of the average for avg
+        return_indices: if True (max only), also returns the flat
+            index in h * w of every maximum, for pool_backward
+        Returns: numpy.ndarray containing the pooled images,
+            and the indices if return_indices is True
     '''
     m, height, width, c = images.shape
     kh, kw = kernel_shape
     sh, sw = stride
+    if mode not in ('max', 'avg'):
+        raise ValueError("mode must be 'max' or 'avg'")
+    if return_indices and mode != 'max':
+        raise ValueError("return_indices requires mode='max'")
+    pad_h, pad_w, ch, cw = pool_padding(height, width, kh, kw, sh, sw,
+                                        padding)
+    padded = images
+    if padding == 'same':
+        fill = -np.inf if mode == 'max' else 0
+        padded = np.pad(images.astype(float), ((0, 0), pad_h, pad_w, (0, 0)),
+                        'constant', constant_values=fill)
+
+    view = windows(padded, kh, kw, sh, sw)[:, :ch, :cw]
+    if mode == 'avg':
+        pooled = view.sum(axis=(4, 5), dtype=float)
+        if padding == 'same':
+            mask = np.pad(np.ones((1, height, width, 1)),
+                          ((0, 0), pad_h, pad_w, (0, 0)), 'constant')
+            pooled /= windows(mask, kh, kw, sh, sw)[:, :ch, :cw].sum(
+                axis=(4, 5))
+        else:
+            pooled /= kh * kw
+        return pooled
+
+    pooled = view.max(axis=(4, 5))
+    if not return_indices:
+        return pooled.astype(float, copy=False)
+
+    # walk the window offsets backwards so the first maximum wins
+    indices = np.zeros(pooled.shape, dtype=np.intp)
+    for a in range(kh - 1, -1, -1):
+        for b in range(kw - 1, -1, -1):
+            values = padded[:, a:a + (ch - 1) * sh + 1:sh,
+                            b:b + (cw - 1) * sw + 1:sw]
+            np.copyto(indices, a * width + b, where=values == pooled)
+    rows = (np.arange(ch) * sh)[:, np.newaxis, np.newaxis] - pad_h[0]
+    cols = (np.arange(cw) * sw)[np.newaxis, :, np.newaxis] - pad_w[0]
+    indices += rows * width + cols
+    return pooled.astype(float, copy=False), indices
+
+
+def pool_backward(dA, images_shape, kernel_shape, stride, mode='max',
+                  padding='valid', indices=None):
+    '''
+        dA: numpy.ndarray with shape (m, ch, cw, c) containing the
+            gradient with respect to the pooled output
+        images_shape: shape (m, h, w, c) of the pooled images
+        kernel_shape, stride, mode, padding: as given to pool
+        indices: the indices returned by pool with
+            return_indices=True, required for max
+        Returns: numpy.ndarray of shape images_shape containing the
+            gradient with respect to the images
+    '''
+    m, height, width, c = images_shape
+    kh, kw = kernel_shape
+    sh, sw = stride
+    if mode == 'max':
+        if indices is None:
+            raise ValueError("max pooling needs the indices from pool")
+        dX = np.zeros((m, height * width, c))
+        batch = np.arange(m)[:, np.newaxis, np.newaxis, np.newaxis]
+        channel = np.arange(c)[np.newaxis, np.newaxis, np.newaxis, :]
+        np.add.at(dX, (batch, indices, channel), dA)
+        return dX.reshape(images_shape)
+    if mode != 'avg':
+        raise ValueError("mode must be 'max' or 'avg'")
 
-    ph = ((height - kh) // sh) + 1
-    pw = ((width - kw) // sw) + 1
-    pooled = np.zeros((m, ph, pw, c))
-
-    for i, h in enumerate(range(0, (height - kh + 1), sh)):
-        for j, w in enumerate(range(0, (width - kw + 1), sw)):
-            if mode == 'max':
-                output = np.max(images[:, h:h + kh, w:w + kw, :], axis=(1, 2))
-            elif mode == 'avg':
-                output = np.average(images[:, h:h + kh, w:w + kw, :],
-                                    axis=(1, 2))
-            else:
-                pass
-            pooled[:, i, j, :] = output
-
-    return pooled
+    pad_h, pad_w, ch, cw = pool_padding(height, width, kh, kw, sh, sw,
+                                        padding)
+    full_h = height + pad_h[0] + pad_h[1]
+    full_w = width + pad_w[0] + pad_w[1]
+    if padding == 'same':
+        mask = np.pad(np.ones((1, height, width, 1)),
+                      ((0, 0), pad_h, pad_w, (0, 0)), 'constant')
+        count = windows(mask, kh, kw, sh, sw)[:, :ch, :cw].sum(axis=(4, 5))
+    else:
+        count = kh * kw
+    share = dA / count
+    dX = np.zeros((m, max(full_h, (ch - 1) * sh + kh),
+                   max(full_w, (cw - 1) * sw + kw), c))
+    for a in range(kh):
+        for b in range(kw):
+            dX[:, a:a + (ch - 1) * sh + 1:sh,
+               b:b + (cw - 1) * sw + 1:sw] += share
+    return dX[:, pad_h[0]:pad_h[0] + height, pad_w[0]:pad_w[0] + width]
@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+    Convolution engine shared by the convolution functions: direct
+    window loop, im2col/GEMM, FFT and Winograd backends plus a cost
+    model that picks one of them per call
+    conv2d = __import__('conv_engine').conv2d
+    conv2d_auto = __import__('conv_engine').conv2d_auto
+    conv2d_batched = __import__('conv_engine').conv2d_batched
+"""
+
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import numpy as np
+
+
+ALGORITHMS = ('direct', 'im2col', 'fft', 'winograd')
+
+"""Rough costs in seconds used by the cost model, fitted to timings
+of every backend on a few hundred random shapes: a fixed cost per
+call, then per Python loop step, per element copied or transformed,
+per GEMM multiply-add, per element written out, per element and
+log2 of the size of an FFT, and per complex multiply-add of the
+frequency domain channel sum"""
+CALL_COSTS = {'direct': 6e-5, 'im2col': 1.5e-5, 'fft': 1.6e-4,
+              'winograd': 1e-4}
+PYTHON_STEP_COST = 1.7e-5
+COPY_COST = 2e-9
+MULTIPLY_ADD_COST = 1e-10
+OUTPUT_COST = 7e-10
+FFT_COST = 1.3e-9
+SPECTRUM_MULTIPLY_ADD_COST = 6e-9
+
+"""Most recent algorithm selections, newest last"""
+audit_log = deque(maxlen=1000)
+
+"""Winograd F(2x2, 3x3) kernel transform, B^T and A^T are applied
+as the additions they encode in _winograd_bt and _winograd_at"""
+WINOGRAD_G = np.array([[1, 0, 0],
+                       [0.5, 0.5, 0.5],
+                       [0.5, -0.5, 0.5],
+                       [0, 0, 1]])
+
+"""Transformed kernels by id: (kernels, copy of kernels, transformed),
+guarded by a lock since conv2d_batched tiles share it across threads"""
+WINOGRAD_CACHE_SIZE = 32
+_winograd_cache = {}
+_winograd_lock = threading.Lock()
+
+
+def pad_images(images, ph, pw):
+    """Zero-pads the height and width axes of (m, h, w, c) images"""
+    if ph == 0 and pw == 0:
+        return images
+    return np.pad(images, ((0, 0), (ph, ph), (pw, pw), (0, 0)),
+                  'constant', constant_values=0)
+
+
+def windows(images, kh, kw, sh, sw):
+    """
+    Strided view of every kernel window, without copying
+
+    Args:
+        images: numpy.ndarray of shape (m, h, w, c), already padded
+        kh, kw: kernel height and width
+        sh, sw: strides
+
+    Returns:
+        view of shape (m, ch, cw, c, kh, kw)
+    """
+    view = np.lib.stride_tricks.sliding_window_view(images, (kh, kw),
+                                                    axis=(1, 2))
+    return view[:, ::sh, ::sw]
+
+
+def conv2d(images, kernels, ph, pw, sh, sw):
+    """
+    Convolves multi-channel images with several kernels at once
+
+    The window view is contracted against all kernels in one
+    tensordot, which numpy runs as a single GEMM on the im2col matrix.
+
+    Args:
+        images: numpy.ndarray of shape (m, h, w, c)
+        kernels: numpy.ndarray of shape (kh, kw, c, nc)
+        ph, pw: zero padding for the height and width
+        sh, sw: strides
+
+    Returns:
+        numpy.ndarray of shape (m, ch, cw, nc) of floats
+    """
+    kh, kw = kernels.shape[:2]
+    view = windows(pad_images(images, ph, pw), kh, kw, sh, sw)
+    output = np.tensordot(view, kernels.transpose(2, 0, 1, 3),
+                          axes=([3, 4, 5], [0, 1, 2]))
+    return output.astype(float, copy=False)
+
+
+def conv2d_direct(images, kernels, ph, pw, sh, sw):
+    """
+    Convolves by looping over the output positions, one small
+    tensordot per window; only worth it for very small outputs
+
+    Same arguments and result as conv2d
+    """
+    kh, kw, _, nc = kernels.shape
+    view = windows(pad_images(images, ph, pw), kh, kw, sh, sw)
+    m, ch, cw = view.shape[:3]
+    output = np.zeros((m, ch, cw, nc))
+    for i in range(ch):
+        for j in range(cw):
+            output[:, i, j] = np.tensordot(view[:, i, j],
+                                           kernels.transpose(2, 0, 1, 3),
+                                           axes=3)
+    return output
+
+
+def conv2d_fft(images, kernels, ph, pw, sh, sw):
+    """
+    Convolves in the frequency domain
+
+    The padded images and the flipped kernels are transformed with a
+    real FFT of the padded image size; the channels are summed in the
+    frequency domain and the stride is applied by subsampling the
+    full stride-1 result. The cost does not grow with the kernel size.
+
+    Same arguments and result as conv2d
+    """
+    kh, kw = kernels.shape[:2]
+    padded = pad_images(images, ph, pw)
+    height, width = padded.shape[1:3]
+    size = (height, width)
+    image_f = np.fft.rfft2(padded, s=size, axes=(1, 2))
+    kernel_f = np.fft.rfft2(kernels[::-1, ::-1], s=size, axes=(0, 1))
+    output_f = np.einsum('mhwc,hwck->mhwk', image_f, kernel_f)
+    output = np.fft.irfft2(output_f, s=size, axes=(1, 2))
+    # float32 inputs transform in float32, return float64 like conv2d
+    return output[:, kh - 1::sh, kw - 1::sw].astype(float, copy=False)
+
+
+def winograd_applies(images, kernels, sh, sw):
+    """True for 3x3 kernels at stride 1 on floating point data"""
+    return (kernels.shape[:2] == (3, 3) and sh == 1 and sw == 1 and
+            (np.issubdtype(images.dtype, np.floating) or
+             np.issubdtype(kernels.dtype, np.floating)))
+
+
+def winograd_kernels(kernels):
+    """
+    Returns G g G^T for (3, 3, c, nc) kernels, as (16, c, nc)
+
+    The result is cached by the identity of the kernels array and
+    reused as long as its values have not changed.
+    """
+    with _winograd_lock:
+        entry = _winograd_cache.get(id(kernels))
+        if (entry is not None and entry[0] is kernels and
+                np.array_equal(entry[1], kernels)):
+            return entry[2]
+        transformed = np.einsum('ij,jkcn,lk->ilcn', WINOGRAD_G, kernels,
+                                WINOGRAD_G, optimize=True)
+        transformed = transformed.reshape(16, *kernels.shape[2:])
+        if len(_winograd_cache) >= WINOGRAD_CACHE_SIZE:
+            del _winograd_cache[next(iter(_winograd_cache))]
+        _winograd_cache[id(kernels)] = (kernels, kernels.copy(),
+                                        transformed)
+        return transformed
+
+
+def _winograd_bt(x0, x1, x2, x3, out):
+    """Writes B^T = [[1, 0, -1, 0], [0, 1, 1, 0], [0, -1, 1, 0],
+    [0, 1, 0, -1]] applied to four rows into out[0..3]"""
+    np.subtract(x0, x2, out=out[0])
+    np.add(x1, x2, out=out[1])
+    np.subtract(x2, x1, out=out[2])
+    np.subtract(x1, x3, out=out[3])
+
+
+def _winograd_at(x0, x1, x2, x3, out):
+    """Writes A^T = [[1, 1, 1, 0], [0, 1, -1, -1]] applied to four
+    rows into out[0..1]"""
+    np.add(x0, x1, out=out[0])
+    np.add(out[0], x2, out=out[0])
+    np.subtract(x1, x2, out=out[1])
+    np.subtract(out[1], x3, out=out[1])
+
+
+def conv2d_winograd(images, kernels, ph, pw, sh, sw):
+    """
+    Convolves with Winograd minimal filtering F(2x2, 3x3)
+
+    Every 2x2 output block comes from a 4x4 input tile: the tiles are
+    transformed with B^T d B, multiplied with the cached kernel
+    transforms as 16 batched matmuls over the channels and brought
+    back with A^T m A, which needs 16 instead of 36 multiplications
+    per block and channel pair. Only for 3x3 kernels at stride 1.
+
+    Same arguments and result as conv2d
+    """
+    if kernels.shape[:2] != (3, 3) or sh != 1 or sw != 1:
+        raise ValueError("winograd needs 3x3 kernels and stride (1, 1)")
+    m, h, w, c = images.shape
+    ch = h + 2 * ph - 2
+    cw = w + 2 * pw - 2
+    th = -(-ch // 2)
+    tw = -(-cw // 2)
+    padded = np.pad(images, ((0, 0), (ph, ph + 2 * th - ch),
+                             (pw, pw + 2 * tw - cw), (0, 0)),
+                    'constant', constant_values=0)
+    output = np.empty((m, 2 * th, 2 * tw, kernels.shape[3]))
+    winograd_tiles(padded, kernels, output)
+    return output[:, :ch, :cw]
+
+
+def winograd_tiles(padded, kernels, output):
+    """
+    Winograd F(2x2, 3x3) on images already padded to whole tiles
+
+    Args:
+        padded: numpy.ndarray of shape (m, 2 * th + 2, 2 * tw + 2, c)
+        kernels: numpy.ndarray of shape (3, 3, c, nc)
+        output: numpy.ndarray of shape (m, 2 * th, 2 * tw, nc)
+            receiving the result
+    """
+    m, th, tw, nc = output.shape
+    th //= 2
+    tw //= 2
+    c = padded.shape[3]
+    # padded[:, a::2, b::2] holds element (a, b) of every 4x4 tile
+    rows = np.empty((4, 4, m, th, tw, c))
+    for a in range(4):
+        _winograd_bt(*(padded[:, a:a + 2 * th:2, b:b + 2 * tw:2]
+                       for b in range(4)), out=rows[a])
+    tiles = np.empty((4, 4, m, th, tw, c))
+    for j in range(4):
+        _winograd_bt(*rows[:, j], out=tiles[:, j])
+
+    products = np.matmul(tiles.reshape(16, m * th * tw, c),
+                         winograd_kernels(kernels))
+    products = products.reshape(4, 4, m, th, tw, nc)
+
+    half = np.empty((4, 2, m, th, tw, nc))
+    for j in range(4):
+        _winograd_at(*products[:, j], out=half[j])
+    for i in range(2):
+        _winograd_at(*half[:, i], out=(output[:, i::2, 0::2],
+                                       output[:, i::2, 1::2]))
+
+
+BACKENDS = {'direct': conv2d_direct, 'im2col': conv2d, 'fft': conv2d_fft,
+            'winograd': conv2d_winograd}
+
+
+def estimate_costs(image_shape, kernel_shape, ph, pw, sh, sw):
+    """
+    Cost model of each backend, in rough seconds
+
+    Args:
+        image_shape: (m, h, w, c)
+        kernel_shape: (kh, kw, c, nc)
+        ph, pw: zero padding
+        sh, sw: strides
+
+    Returns:
+        dict mapping each algorithm to its estimated cost
+    """
+    m, h, w, c = image_shape
+    kh, kw, _, nc = kernel_shape
+    height = h + 2 * ph
+    width = w + 2 * pw
+    ch = (height - kh) // sh + 1
+    cw = (width - kw) // sw + 1
+    outputs = m * ch * cw
+    window = kh * kw * c
+    # the FFT always computes the full stride-1 output of the padded
+    # images and only subsamples it for the stride afterwards
+    transforms = (m * c + c * nc + m * nc) * height * width
+    spectrum = m * height * (width // 2 + 1) * c * nc
+    if kh == 3 and kw == 3 and sh == 1 and sw == 1:
+        tiles = m * -(-ch // 2) * -(-cw // 2)
+        winograd = (CALL_COSTS['winograd'] +
+                    tiles * 16 * (2 * c + 3 * nc) * COPY_COST +
+                    tiles * 16 * c * nc * MULTIPLY_ADD_COST)
+    else:
+        winograd = float('inf')
+    return {
+        'direct': (CALL_COSTS['direct'] + ch * cw * PYTHON_STEP_COST +
+                   outputs * window * COPY_COST +
+                   outputs * window * nc * MULTIPLY_ADD_COST),
+        'im2col': (CALL_COSTS['im2col'] + outputs * window * COPY_COST +
+                   outputs * window * nc * MULTIPLY_ADD_COST +
+                   outputs * nc * OUTPUT_COST),
+        'fft': float(CALL_COSTS['fft'] +
+                     transforms * np.log2(max(height * width, 2)) *
+                     FFT_COST + spectrum * SPECTRUM_MULTIPLY_ADD_COST),
+        'winograd': winograd,
+    }
+
+
+def select_algorithm(images, kernels, ph, pw, sh, sw):
+    """
+    Picks the cheapest backend for this call
+
+    FFT and Winograd results carry rounding noise, so they are only
+    picked for floating point inputs; integer inputs keep exact
+    results.
+
+    Returns:
+        (algorithm, costs)
+    """
+    costs = estimate_costs(images.shape, kernels.shape, ph, pw, sh, sw)
+    candidates = list(ALGORITHMS)
+    if not (np.issubdtype(images.dtype, np.floating) or
+            np.issubdtype(kernels.dtype, np.floating)):
+        candidates.remove('fft')
+        candidates.remove('winograd')
+    return min(candidates, key=costs.get), costs
+
+
+def gemm_algorithm(images, kernels, ph, pw, sh, sw):
+    """
+    Returns 'winograd' when the kernels qualify for it and the cost
+    model expects it to beat im2col, else 'im2col'
+    """
+    if not winograd_applies(images, kernels, sh, sw):
+        return 'im2col'
+    costs = estimate_costs(images.shape, kernels.shape, ph, pw, sh, sw)
+    if costs['winograd'] < costs['im2col']:
+        return 'winograd'
+    return 'im2col'
+
+
+def conv2d_auto(images, kernels, ph, pw, sh, sw, algorithm='auto'):
+    """
+    Convolves with the backend chosen by the cost model, or with the
+    one named by algorithm, and records the choice in audit_log
+
+    Same arguments and result as conv2d, plus:
+        algorithm: 'auto', 'direct', 'im2col', 'fft' or 'winograd'
+    """
+    if algorithm == 'auto':
+        algorithm, costs = select_algorithm(images, kernels, ph, pw, sh, sw)
+    elif algorithm in BACKENDS:
+        costs = estimate_costs(images.shape, kernels.shape, ph, pw, sh, sw)
+    else:
+        raise ValueError("algorithm must be 'auto' or one of {}"
+                         .format(ALGORITHMS))
+    start = time.perf_counter()
+    output = BACKENDS[algorithm](images, kernels, ph, pw, sh, sw)
+    audit_log.append({'algorithm': algorithm,
+                      'image_shape': images.shape,
+                      'kernel_shape': kernels.shape,
+                      'padding': (ph, pw), 'stride': (sh, sw),
+                      'estimated': costs,
+                      'seconds': time.perf_counter() - start})
+    return output
+
+
+def output_shape(image_shape, kernel_shape, ph, pw, sh, sw):
+    """Returns (m, ch, cw, nc) for (m, h, w, c) images"""
+    m, h, w, _ = image_shape
+    kh, kw, _, nc = kernel_shape
+    return (m, (h + 2 * ph - kh) // sh + 1, (w + 2 * pw - kw) // sw + 1, nc)
+
+
+def open_output(out, shape):
+    """
+    Returns the float array receiving a batched result
+
+    Args:
+        out: None for a new in-memory array, a path to a .npy file
+            to create as a memmap, or an existing array of the shape
+        shape: shape of the result
+    """
+    if out is None:
+        return np.empty(shape)
+    if isinstance(out, np.ndarray):
+        if out.shape != tuple(shape):
+            raise ValueError("out must have the shape {}".format(shape))
+        return out
+    return np.lib.format.open_memmap(out, mode='w+', dtype=float,
+                                     shape=tuple(shape))
+
+
+def tile_bytes(algorithm, image_shape, kernel_shape, ph, pw, sh, sw):
+    """Estimated peak bytes needed to convolve one image of the batch"""
+    _, h, w, c = image_shape
+    kh, kw, _, nc = kernel_shape
+    height = h + 2 * ph
+    width = w + 2 * pw
+    _, ch, cw, _ = output_shape(image_shape, kernel_shape, ph, pw, sh, sw)
+    scratch = height * width * c * 8
+    result = ch * cw * nc * 8
+    if algorithm == 'im2col':
+        work = ch * cw * kh * kw * c * 8
+    elif algorithm == 'fft':
+        work = height * (width // 2 + 1) * 16 * (c + 2 * nc)
+        work += height * width * nc * 8
+    elif algorithm == 'winograd':
+        tiles = -(-ch // 2) * -(-cw // 2)
+        work = tiles * 16 * 8 * (2 * c + 2 * nc)
+    else:
+        work = kh * kw * c * 8
+    return scratch + result + work
+
+
+def conv2d_batched(images, kernels, ph, pw, sh, sw, out=None,
+                   max_memory=None, workers=1, algorithm='im2col'):
+    """
+    Convolves a batch tile by tile with bounded memory
+
+    The batch is split along m. Each thread pads its tiles into one
+    reused scratch buffer instead of padding the whole batch up front,
+    convolves them and writes the result straight into out. numpy
+    releases the GIL in BLAS, FFT and ufunc calls, so tiles run in
+    parallel on a thread pool.
+
+    Same arguments as conv2d, plus:
+        out: None, a preallocated array of the output shape, or a
+            path to a .npy file created as a memmap
+        max_memory: cap in bytes on the working memory of all the
+            threads (scratch, backend temporaries and tile results);
+            None puts the whole batch in one tile per thread; a
+            ValueError is raised if it cannot hold one image per thread
+        workers: number of threads
+        algorithm: 'auto', 'direct', 'im2col', 'fft' or 'winograd',
+            chosen once for the whole batch
+
+    Returns:
+        out, of shape (m, ch, cw, nc)
+    """
+    m, h, w, c = images.shape
+    if algorithm == 'auto':
+        algorithm, _ = select_algorithm(images, kernels, ph, pw, sh, sw)
+    elif algorithm not in BACKENDS:
+        raise ValueError("algorithm must be 'auto' or one of {}"
+                         .format(ALGORITHMS))
+    backend = BACKENDS[algorithm]
+
+    if max_memory is None:
+        tile = -(-m // max(workers, 1))
+    else:
+        per_image = tile_bytes(algorithm, images.shape, kernels.shape,
+                               ph, pw, sh, sw)
+        tile = int(max_memory // (max(workers, 1) * per_image))
+        if tile < 1 and m:
+            raise ValueError("max_memory must hold one image per worker: "
+                             "{} bytes".format(max(workers, 1) * per_image))
+    tile = min(max(tile, 1), max(m, 1))
+    shape = output_shape(images.shape, kernels.shape, ph, pw, sh, sw)
+    out = open_output(out, shape)
+    local = threading.local()
+
+    def run(start):
+        """Pads one tile into the scratch buffer and convolves it"""
+        count = min(tile, m - start)
+        scratch = getattr(local, 'scratch', None)
+        if scratch is None:
+            scratch = np.zeros((tile, h + 2 * ph, w + 2 * pw, c),
+                               images.dtype)
+            local.scratch = scratch
+        scratch = scratch[:count]
+        scratch[:, ph:ph + h, pw:pw + w] = images[start:start + count]
+        out[start:start + count] = backend(scratch, kernels, 0, 0, sh, sw)
+
+    starts = range(0, m, tile)
+    if workers <= 1 or len(starts) == 1:
+        for start in starts:
+            run(start)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(run, starts))
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
+
+
+def conv2d_grayscale(images, kernel, ph, pw, sh, sw, algorithm='im2col',
+                     out=None, max_memory=None, workers=1):
+    """Convolves (m, h, w) images with one (kh, kw) kernel
+
+    out, max_memory and workers run the batch through conv2d_batched;
+    out then has the shape (m, ch, cw) or is a .npy path
+    """
+    images = images[..., np.newaxis]
+    kernel = kernel[:, :, np.newaxis, np.newaxis]
+    if out is None and max_memory is None and workers == 1:
+        output = conv2d_auto(images, kernel, ph, pw, sh, sw, algorithm)
+        return output[..., 0]
+    shape = output_shape(images.shape, kernel.shape, ph, pw, sh, sw)
+    out = open_output(out, shape[:3])
+    conv2d_batched(images, kernel, ph, pw, sh, sw, out[..., np.newaxis],
+                   max_memory, workers, algorithm)
+    return out
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+    Reusable execution plans for convolution and pooling layers
+    Conv2D = __import__('layer_plans').Conv2D
+    Pool2D = __import__('layer_plans').Pool2D
+"""
+
+
+import numpy as np
+engine = __import__('conv_engine')
+pool_padding = __import__('6-pool').pool_padding
+
+
+class Conv2D:
+    """
+    Convolution plan for a fixed (input_shape, kernel_shape, padding,
+    stride), in the spirit of an FFTW plan
+
+    The padding, output shape and backend are worked out once, and
+    the padded input buffer, the im2col columns (or the Winograd
+    tiles) and the strided window view that fills them are allocated
+    once. Calling the plan copies the images into the buffer and runs
+    numpy kernels on the prepared arrays, so it does no shape logic.
+    """
+
+    def __init__(self, input_shape, kernel_shape, padding='same',
+                 stride=(1, 1), algorithm='auto'):
+        """
+        Args:
+            input_shape: (m, h, w, c) of the images
+            kernel_shape: (kh, kw, c, nc) of the kernels
+            padding: tuple of (ph, pw), 'same' or 'valid', as in
+                5-convolve.convolve
+            stride: tuple of (sh, sw)
+            algorithm: 'auto', 'im2col' or 'winograd'; 'auto' takes
+                Winograd for 3x3 kernels at stride (1, 1) when the
+                cost model expects it to be faster. Winograd adds
+                rounding noise, use 'im2col' for exact integer results
+        """
+        m, height, width, c = input_shape
+        kh, kw, _, nc = kernel_shape
+        sh, sw = stride
+        if padding == 'same':
+            ph = ((((height - 1) * sh) + kh - height) // 2) + 1
+            pw = ((((width - 1) * sw) + kw - width) // 2) + 1
+        elif padding == 'valid':
+            ph = 0
+            pw = 0
+        else:
+            ph, pw = padding
+        qualifies = kh == 3 and kw == 3 and sh == 1 and sw == 1
+        if algorithm == 'auto':
+            costs = engine.estimate_costs(input_shape, kernel_shape,
+                                          ph, pw, sh, sw)
+            algorithm = 'im2col'
+            if costs['winograd'] < costs['im2col']:
+                algorithm = 'winograd'
+        elif algorithm not in ('im2col', 'winograd'):
+            raise ValueError("algorithm must be 'auto', 'im2col' or "
+                             "'winograd'")
+        elif algorithm == 'winograd' and not qualifies:
+            raise ValueError("winograd needs 3x3 kernels and stride (1, 1)")
+
+        self.input_shape = tuple(input_shape)
+        self.kernel_shape = tuple(kernel_shape)
+        self.padding = (ph, pw)
+        self.stride = (sh, sw)
+        self.algorithm = algorithm
+        self.output_shape = engine.output_shape(input_shape, kernel_shape,
+                                                ph, pw, sh, sw)
+        _, ch, cw, _ = self.output_shape
+        if algorithm == 'winograd':
+            th = -(-ch // 2)
+            tw = -(-cw // 2)
+            self._padded = np.zeros((m, 2 * th + 2, 2 * tw + 2, c))
+            self._tiles = np.empty((m, 2 * th, 2 * tw, nc))
+            self._crop = self._tiles[:, :ch, :cw]
+        else:
+            self._padded = np.zeros((m, height + 2 * ph, width + 2 * pw, c))
+            self._windows = engine.windows(self._padded, kh, kw, sh, sw)
+            self._windows = self._windows.transpose(0, 1, 2, 4, 5, 3)
+            self._columns = np.empty(self._windows.shape)
+            self._matrix = self._columns.reshape(m * ch * cw, kh * kw * c)
+            self._flat_shape = (m * ch * cw, nc)
+            self._kernel_rows = (kh * kw * c, nc)
+        self._interior = self._padded[:, ph:ph + height, pw:pw + width]
+
+    def __call__(self, images, kernels, out=None):
+        """
+        Convolves images with kernels
+
+        Args:
+            images: numpy.ndarray of the plan's input_shape
+            kernels: numpy.ndarray of the plan's kernel_shape
+            out: None, a float array of the output shape (C-contiguous
+                for im2col) or a path to a .npy file created as a
+                memmap
+
+        Returns:
+            numpy.ndarray of shape output_shape
+        """
+        result = engine.open_output(out, self.output_shape)
+        np.copyto(self._interior, images)
+        if self.algorithm == 'winograd':
+            engine.winograd_tiles(self._padded, kernels, self._tiles)
+            np.copyto(result, self._crop)
+        else:
+            np.copyto(self._columns, self._windows)
+            np.dot(self._matrix, kernels.reshape(self._kernel_rows),
+                   out=result.reshape(self._flat_shape))
+        return result
+
+
+class Pool2D:
+    """
+    Pooling plan for a fixed (input_shape, kernel_shape, stride, mode,
+    padding), in the spirit of an FFTW plan
+
+    The padded buffer and one strided slice of it per window offset,
+    the per-window counts used by 'same' average pooling, and the
+    index tables used to return the position of every maximum and to
+    scatter gradients back are built once. Calling the plan only
+    copies the images in and reduces the slices.
+    """
+
+    def __init__(self, input_shape, kernel_shape, stride, mode='max',
+                 padding='valid'):
+        """
+        Args:
+            input_shape: (m, h, w, c) of the images
+            kernel_shape: tuple of (kh, kw)
+            stride: tuple of (sh, sw)
+            mode: 'max' or 'avg'
+            padding: 'valid' or 'same', as in 6-pool.pool
+        """
+        m, height, width, c = input_shape
+        kh, kw = kernel_shape
+        sh, sw = stride
+        if mode not in ('max', 'avg'):
+            raise ValueError("mode must be 'max' or 'avg'")
+        pad_h, pad_w, ch, cw = pool_padding(height, width, kh, kw, sh, sw,
+                                            padding)
+        self.input_shape = tuple(input_shape)
+        self.kernel_shape = (kh, kw)
+        self.stride = (sh, sw)
+        self.mode = mode
+        self.padding = padding
+        self.output_shape = (m, ch, cw, c)
+
+        fill = -np.inf if mode == 'max' else 0.0
+        self._padded = np.full((m, height + sum(pad_h), width + sum(pad_w),
+                                c), fill)
+        self._interior = self._padded[:, pad_h[0]:pad_h[0] + height,
+                                      pad_w[0]:pad_w[0] + width]
+        self._count = kh * kw
+        if padding == 'same':
+            mask = np.pad(np.ones((1, height, width, 1)),
+                          ((0, 0), pad_h, pad_w, (0, 0)), 'constant')
+            self._count = engine.windows(mask, kh, kw, sh,
+                                         sw)[:, :ch, :cw].sum(axis=(4, 5))
+
+        # one strided slice per window offset, last offset first so
+        # the first maximum wins, and the flat index of window (0, 0)
+        offsets = [(a, b) for a in range(kh - 1, -1, -1)
+                   for b in range(kw - 1, -1, -1)]
+        self._offsets = [(self._padded[:, a:a + (ch - 1) * sh + 1:sh,
+                                       b:b + (cw - 1) * sw + 1:sw],
+                          a * width + b) for a, b in offsets]
+        rows = (np.arange(ch) * sh)[:, np.newaxis, np.newaxis] - pad_h[0]
+        cols = (np.arange(cw) * sw)[np.newaxis, :, np.newaxis] - pad_w[0]
+        self._base = rows * width + cols
+        self._scatter = (np.arange(m)[:, np.newaxis, np.newaxis, np.newaxis],
+                         np.arange(c)[np.newaxis, np.newaxis, np.newaxis, :])
+        self._flat_input = (m, height * width, c)
+
+        self._grad = np.zeros((m, max(self._padded.shape[1],
+                                      (ch - 1) * sh + kh),
+                               max(self._padded.shape[2],
+                                   (cw - 1) * sw + kw), c))
+        self._grad_slices = [self._grad[:, a:a + (ch - 1) * sh + 1:sh,
+                                        b:b + (cw - 1) * sw + 1:sw]
+                             for a, b in offsets]
+        self._grad_interior = self._grad[:, pad_h[0]:pad_h[0] + height,
+                                         pad_w[0]:pad_w[0] + width]
+
+    def __call__(self, images, return_indices=False, out=None):
+        """
+        Pools images
+
+        Args:
+            images: numpy.ndarray of the plan's input_shape
+            return_indices: if True (max only), also returns the flat
+                index in h * w of every maximum, for backward
+            out: None or a float array of the output shape
+
+        Returns:
+            numpy.ndarray of shape output_shape, and the indices if
+            return_indices is True
+        """
+        if return_indices and self.mode != 'max':
+            raise ValueError("return_indices requires mode='max'")
+        pooled = engine.open_output(out, self.output_shape)
+        np.copyto(self._interior, images)
+        # reducing kh * kw strided slices beats reducing the small
+        # trailing axes of the window view
+        np.copyto(pooled, self._offsets[0][0])
+        if self.mode == 'avg':
+            for values, _ in self._offsets[1:]:
+                np.add(pooled, values, out=pooled)
+            np.divide(pooled, self._count, out=pooled)
+            return pooled
+        for values, _ in self._offsets[1:]:
+            np.maximum(pooled, values, out=pooled)
+        if not return_indices:
+            return pooled
+        indices = np.zeros(self.output_shape, dtype=np.intp)
+        for values, offset in self._offsets:
+            np.copyto(indices, offset, where=values == pooled)
+        indices += self._base
+        return pooled, indices
+
+    def backward(self, dA, indices=None):
+        """
+        Gradient with respect to the images
+
+        Args:
+            dA: numpy.ndarray of shape output_shape containing the
+                gradient with respect to the pooled output
+            indices: the indices returned by the plan with
+                return_indices=True, required for max
+
+        Returns:
+            numpy.ndarray of the plan's input_shape
+        """
+        if self.mode == 'max':
+            if indices is None:
+                raise ValueError("max pooling needs the indices from pool")
+            dX = np.zeros(self._flat_input)
+            np.add.at(dX, (self._scatter[0], indices, self._scatter[1]), dA)
+            return dX.reshape(self.input_shape)
+        share = dA / self._count
+        self._grad.fill(0)
+        for grad in self._grad_slices:
+            grad += share
+        return self._grad_interior.copy()
@@ -3,14 +3,81 @@
 "import numpy as np"
 
 
-def np_elementwise(mat1, mat2):
-    """A function that performs  element wise addition"""
-    elementwise_sum = mat1 + mat2
-    elementwise_diff = mat1 - mat2
-    elementwise_prod = mat1 * mat2
-    elementwise_quot = mat1 / mat2
-
-    return (elementwise_sum,
-            elementwise_diff,
-            elementwise_prod,
-            elementwise_quot)
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+L2_CACHE_BYTES = 1 << 20
+
+
+def np_elementwise(mat1, mat2, out=None, workers=1):
+    """A function that performs  element wise addition
+
+    Args:
+        mat1: numpy.ndarray
+        mat2: numpy.ndarray or scalar broadcastable to mat1
+        out: optional tuple of four preallocated arrays receiving the
+            sum, difference, product and quotient
+        workers: number of threads sharing the chunks; numpy releases
+            the GIL inside the ufuncs
+
+    Returns:
+        the tuple (sum, difference, product, quotient)
+    """
+    if out is None and workers == 1:
+        elementwise_sum = mat1 + mat2
+        elementwise_diff = mat1 - mat2
+        elementwise_prod = mat1 * mat2
+        elementwise_quot = mat1 / mat2
+
+        return (elementwise_sum,
+                elementwise_diff,
+                elementwise_prod,
+                elementwise_quot)
+
+    mat1 = np.asarray(mat1)
+    mat2 = np.asarray(mat2)
+    if out is None:
+        shape = np.broadcast_shapes(mat1.shape, mat2.shape)
+        dtype = np.result_type(mat1, mat2)
+        quot_dtype = np.true_divide(np.ones(1, mat1.dtype),
+                                    np.ones(1, mat2.dtype)).dtype
+        out = (np.empty(shape, dtype), np.empty(shape, dtype),
+               np.empty(shape, dtype), np.empty(shape, quot_dtype))
+    out = tuple(out)
+
+    blocked = (mat1.shape == mat2.shape and mat1.flags.c_contiguous and
+               mat2.flags.c_contiguous and
+               all(o.shape == mat1.shape and o.flags.c_contiguous
+                   for o in out))
+    if not blocked:
+        _fused(mat1, mat2, out)
+        return out
+
+    flat1 = mat1.reshape(-1)
+    flat2 = mat2.reshape(-1)
+    flat_out = [o.reshape(-1) for o in out]
+    itemsize = max(flat1.itemsize, flat2.itemsize,
+                   max(o.itemsize for o in out))
+    chunk = max(L2_CACHE_BYTES // (6 * itemsize), 1)
+    slices = [slice(i, i + chunk) for i in range(0, flat1.size, chunk)]
+
+    def run(s):
+        """Evaluates the four operations on one chunk"""
+        _fused(flat1[s], flat2[s], [o[s] for o in flat_out])
+
+    if workers == 1 or len(slices) == 1:
+        for s in slices:
+            run(s)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(run, slices))
+    return out
+
+
+def _fused(mat1, mat2, out):
+    """Writes sum, difference, product and quotient into out"""
+    np.add(mat1, mat2, out=out[0])
+    np.subtract(mat1, mat2, out=out[1])
+    np.multiply(mat1, mat2, out=out[2])
+    np.true_divide(mat1, mat2, out=out[3])
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+import time
+import tracemalloc
+import numpy as np
+np_elementwise = __import__('12-bracin_the_elements').np_elementwise
+
+
+def measure(func, calls):
+    """Returns (seconds, bytes allocated in total) for calls of func"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    allocated = 0
+    for _ in range(calls):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    return elapsed, allocated
+
+
+if __name__ == "__main__":
+    np.random.seed(0)
+    mat1 = np.random.randn(1024, 1024)
+    mat2 = np.random.randn(1024, 1024)
+    out = tuple(np.empty_like(mat1) for _ in range(4))
+    calls = 20
+
+    cases = [
+        ("four passes", lambda: np_elementwise(mat1, mat2)),
+        ("fused, out=", lambda: np_elementwise(mat1, mat2, out=out)),
+        ("fused, out=, 4 threads",
+         lambda: np_elementwise(mat1, mat2, out=out, workers=4)),
+    ]
+    for name, func in cases:
+        elapsed, allocated = measure(func, calls)
+        print("{:<24} {:8.2f} ms/call {:10.1f} KiB allocated/call"
+              .format(name, 1000 * elapsed / calls,
+                      allocated / calls / 1024))
+
+    expected = np_elementwise(mat1, mat2)
+    fused = np_elementwise(mat1, mat2, out=out, workers=4)
+    print(all(np.array_equal(a, b) for a, b in zip(expected, fused)))
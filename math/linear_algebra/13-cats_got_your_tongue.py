@@ -2,8 +2,33 @@
 
 import numpy as np
 """A function that concatenates two matrices at specific axis"""
+out_of_core = __import__('out_of_core')
 
 
-def np_cat(mat1, mat2, axis=0):
-    """A function that concatenates two matrices at specific axis"""
-    return np.concatenate((mat1, mat2), axis=axis)
+def np_cat(mat1, mat2, axis=0, out=None):
+    """A function that concatenates two matrices at specific axis
+
+    If out is given (a .npy path or a preallocated array/memmap), both
+    matrices are copied into it panel by panel instead of building a
+    new in-memory array.
+    """
+    if out is None:
+        return np.concatenate((mat1, mat2), axis=axis)
+
+    axis = axis % mat1.ndim
+    if (mat1.ndim != mat2.ndim or
+            any(a != b for i, (a, b) in enumerate(zip(mat1.shape,
+                                                      mat2.shape))
+                if i != axis)):
+        raise ValueError("all the input array dimensions except for the "
+                         "concatenation axis must match exactly")
+    shape = list(mat1.shape)
+    shape[axis] += mat2.shape[axis]
+    out = out_of_core.open_output(out, shape, np.result_type(mat1, mat2))
+
+    split = mat1.shape[axis]
+    lead = (slice(None),) * axis
+    out_of_core.copy_panels(out[lead + (slice(0, split),)], mat1)
+    out_of_core.copy_panels(out[lead + (slice(split, None),)], mat2)
+    out_of_core.flush(out)
+    return out
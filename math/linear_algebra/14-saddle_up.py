@@ -1,7 +1,45 @@
 #!/usr/bin/env python3
 
 import numpy as np
+out_of_core = __import__('out_of_core')
 
 
-def np_matmul(mat1, mat2):
-    return np.dot(mat1, mat2)
+def np_matmul(mat1, mat2, out=None, panel_bytes=out_of_core.PANEL_BYTES):
+    """A function that performs matrix multiplication
+
+    If out is given (a .npy path or a preallocated array/memmap), or
+    either operand is a numpy.memmap, the product is streamed in
+    row panels of mat1 against column panels of mat2, so only about
+    panel_bytes of each operand is resident at a time. out is only
+    supported for 2D operands, a ValueError is raised otherwise.
+    """
+    two_d = np.ndim(mat1) == 2 and np.ndim(mat2) == 2
+    if out is not None and not two_d:
+        raise ValueError("out requires 2D operands")
+    streamed = (isinstance(mat1, np.memmap) or isinstance(mat2, np.memmap)
+                or out is not None)
+    if not streamed or not two_d:
+        return np.dot(mat1, mat2)
+    if mat1.shape[1] != mat2.shape[0]:
+        raise ValueError("shapes {} and {} not aligned"
+                         .format(mat1.shape, mat2.shape))
+
+    shape = (mat1.shape[0], mat2.shape[1])
+    dtype = np.result_type(mat1, mat2)
+    if out is None:
+        out = np.empty(shape, dtype)
+    else:
+        out = out_of_core.open_output(out, shape, dtype)
+
+    col_step = out_of_core.panel_rows(mat2.shape[0] * mat2.itemsize,
+                                      panel_bytes)
+    row_step = out_of_core.panel_rows(
+        mat1.shape[1] * mat1.itemsize + col_step * out.itemsize,
+        panel_bytes)
+    for c in range(0, shape[1], col_step):
+        panel2 = np.asarray(mat2[:, c:c + col_step])
+        for r in range(0, shape[0], row_step):
+            out[r:r + row_step, c:c + col_step] = np.dot(
+                np.asarray(mat1[r:r + row_step]), panel2)
+    out_of_core.flush(out)
+    return out
@@ -3,10 +3,57 @@
 "matrix_shape = __import__('2-size_me_please').matrix_shape"
 
 
-def matrix_shape(matrix):
-    """Calculate the shape of a matrix."""
+Matrix = __import__('flat_matrix').Matrix
+LazyView = __import__('lazy_views').LazyView
+
+CACHE_SIZE = 256
+_shape_cache = {}
+
+
+def matrix_shape(matrix, first_only=False):
+    """Calculate the shape of a matrix.
+
+    Every nested list/tuple is checked in a single iterative pass and
+    None is returned if the matrix is ragged. With first_only=True only
+    matrix[0] is followed down, without validation.
+
+    Shapes of matrices built only from tuples cannot change, so they
+    are cached by object id and later calls skip the traversal.
+    """
+    if isinstance(matrix, (Matrix, LazyView)):
+        return list(matrix.shape)
+    cached = _shape_cache.get(id(matrix))
+    if cached is not None and cached[0] is matrix:
+        return list(cached[1])
+
     shape = []
-    while isinstance(matrix, list):
-        shape.append(len(matrix))
-        matrix = matrix[0]
+    node = matrix
+    while isinstance(node, (list, tuple)):
+        shape.append(len(node))
+        if len(node) == 0:
+            break
+        node = node[0]
+    if first_only:
+        return shape
+
+    depth = len(shape)
+    immutable = True
+    stack = [(matrix, 0)]
+    while stack:
+        node, level = stack.pop()
+        if level == depth:
+            if isinstance(node, (list, tuple)):
+                return None
+            continue
+        if not isinstance(node, (list, tuple)) or len(node) != shape[level]:
+            return None
+        if isinstance(node, list):
+            immutable = False
+        stack.extend((child, level + 1) for child in node)
+
+    if immutable:
+        if len(_shape_cache) >= CACHE_SIZE:
+            del _shape_cache[next(iter(_shape_cache))]
+        # keep a reference so the id cannot be reused while cached
+        _shape_cache[id(matrix)] = (matrix, tuple(shape))
     return shape
@@ -3,8 +3,22 @@
 "matrix_transpose = __import__('3-flip_me_over').matrix_transpose"
 
 
-def matrix_transpose(matrix):
-    """Return the transpose of a 2D matrix."""
+Matrix = __import__('flat_matrix').Matrix
+TransposeView = __import__('lazy_views').TransposeView
+
+
+def matrix_transpose(matrix, view=False):
+    """Return the transpose of a 2D matrix.
+
+    If view is True, a list of lists is not copied: a TransposeView
+    swapping the indices is returned and it is only materialized on
+    write or on .materialize()
+    """
+    # A Matrix is transposed as a view over the same buffer
+    if isinstance(matrix, Matrix):
+        return matrix.T
+    if view:
+        return TransposeView(matrix)
     # Transpose the matrix using list comprehension
     return [
         [
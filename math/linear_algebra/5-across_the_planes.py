@@ -3,9 +3,18 @@
 "add_matrices2D = __import__('5-across_the_planes').add_matrices2D"
 
 
+Matrix = __import__('flat_matrix').Matrix
+matrix_shape = __import__('2-size_me_please').matrix_shape
+
+
 def add_matrices2D(mat1, mat2):
-    """Check if matrices have the same shape"""
-    if len(mat1) != len(mat2) or len(mat1[0]) != len(mat2[0]):
+    """Add through the flat buffers if either matrix is a Matrix"""
+    if isinstance(mat1, Matrix) or isinstance(mat2, Matrix):
+        return Matrix.from_list(mat1).add(Matrix.from_list(mat2))
+
+    """Check if matrices have the same shape, reusing cached shapes"""
+    shape = matrix_shape(mat1)
+    if shape is None or len(shape) != 2 or shape != matrix_shape(mat2):
         return None
 
     """Create a new matrix to store the result"""
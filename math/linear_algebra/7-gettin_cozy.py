@@ -3,15 +3,27 @@
 """cat_matrices2D .cat_matrices2D"""
 
 
-def cat_matrices2D(mat1, mat2, axis=0):
-    """A function that concatenates two matrices"""
+Matrix = __import__('flat_matrix').Matrix
+ConcatView = __import__('lazy_views').ConcatView
+
+
+def cat_matrices2D(mat1, mat2, axis=0, view=False):
+    """A function that concatenates two matrices
+
+    If view is True, a ConcatView reading from mat1 and mat2 is
+    returned instead of a copy, and it is only materialized on
+    write or on .materialize()
+    """
+    if isinstance(mat1, Matrix) or isinstance(mat2, Matrix):
+        return Matrix.from_list(mat1).concat(Matrix.from_list(mat2), axis)
+
     if axis == 0:
         """Check if the matrices have the same number of columns"""
         if len(mat1[0]) != len(mat2[0]):
             return None
 
         """Concatenate along the rows (axis=0)"""
-        result = mat1 + mat2
+        result = None if view else mat1 + mat2
 
     elif axis == 1:
         """Check if the matrices have the same number of rows"""
@@ -19,10 +31,13 @@ def cat_matrices2D(mat1, mat2, axis=0):
             return None
 
         """Concatenate along the columns (axis=1)"""
-        result = [row1 + row2 for row1, row2 in zip(mat1, mat2)]
+        result = None if view else [row1 + row2
+                                    for row1, row2 in zip(mat1, mat2)]
 
     else:
         """Invalid axis value"""
         return None
 
+    if view:
+        return ConcatView(mat1, mat2, axis)
     return result
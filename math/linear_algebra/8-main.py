@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+
+import random
+import time
+mat_mul = __import__('8-ridin_bareback').mat_mul
+
+
+def naive_mat_mul(mat1, mat2):
+    """Triple loop product of two lists of lists"""
+    result = [[0 for _ in range(len(mat2[0]))] for _ in range(len(mat1))]
+    for i in range(len(mat1)):
+        for j in range(len(mat2[0])):
+            for k in range(len(mat2)):
+                result[i][j] += mat1[i][k] * mat2[k][j]
+    return result
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    for size in (64, 256, 1024):
+        mat1 = [[random.random() for _ in range(size)] for _ in range(size)]
+        mat2 = [[random.random() for _ in range(size)] for _ in range(size)]
+        start = time.perf_counter()
+        fast = mat_mul(mat1, mat2)
+        fast_time = time.perf_counter() - start
+        start = time.perf_counter()
+        slow = naive_mat_mul(mat1, mat2)
+        slow_time = time.perf_counter() - start
+        print("{0}x{0}: loop {1:.3f}s, engine {2:.3f}s ({3:.1f}x)"
+              .format(size, slow_time, fast_time, slow_time / fast_time))
+        assert fast == slow, size
+    print(mat_mul([[1, 2]], [[1, 2]]))
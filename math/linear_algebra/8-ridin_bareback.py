@@ -3,18 +3,23 @@
 """mat_mul = __import__('8-ridin_bareback').mat_mul"""
 
 
+matmul = __import__('matmul_engine').matmul
+Matrix = __import__('flat_matrix').Matrix
+matrix_shape = __import__('2-size_me_please').matrix_shape
+
+
 def mat_mul(mat1, mat2):
+    """Multiply through the flat buffers if either matrix is a Matrix"""
+    if isinstance(mat1, Matrix) or isinstance(mat2, Matrix):
+        return Matrix.from_list(mat1).matmul(Matrix.from_list(mat2))
+
     """Check if the number of columns in mat1 = mat2"""
-    if len(mat1[0]) != len(mat2):
+    shape1 = matrix_shape(mat1)
+    shape2 = matrix_shape(mat2)
+    if shape1 is None or shape2 is None:
+        return None
+    if len(shape1) != 2 or len(shape2) != 2 or shape1[1] != shape2[0]:
         return None
 
-    """Initialize the result matrix with zeros"""
-    result = [[0 for _ in range(len(mat2[0]))] for _ in range(len(mat1))]
-
-    """Perform matrix multiplication"""
-    for i in range(len(mat1)):
-        for j in range(len(mat2[0])):
-            for k in range(len(mat2)):
-                result[i][j] += mat1[i][k] * mat2[k][j]
-
-    return result
+    """Perform matrix multiplication with the blocked engine"""
+    return matmul(mat1, mat2)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+    Compact 2D matrix backed by a flat array('d') buffer
+    Matrix = __import__('flat_matrix').Matrix
+"""
+
+
+from array import array
+from operator import add
+
+
+multiply_rows = __import__('matmul_engine').multiply_rows
+
+
+class Matrix:
+    """
+    2D matrix of floats stored in a flat array('d') buffer
+
+    The element (i, j) lives at data[offset + i * strides[0] +
+    j * strides[1]], so transposing and slicing only create a new
+    shape/strides/offset over the same buffer (a view)
+    """
+
+    __slots__ = ('data', 'shape', 'strides', 'offset')
+
+    def __init__(self, data, shape, strides=None, offset=0):
+        """
+        Args:
+            data: array('d') holding the elements
+            shape: tuple of (rows, columns)
+            strides: tuple of element steps for (rows, columns),
+                row-major if None
+            offset: index in data of the element (0, 0)
+        """
+        self.data = data
+        self.shape = tuple(shape)
+        if strides is None:
+            strides = (self.shape[1], 1)
+        self.strides = tuple(strides)
+        self.offset = offset
+
+    @classmethod
+    def from_list(cls, rows):
+        """Builds a contiguous Matrix from a list of lists"""
+        if isinstance(rows, cls):
+            return rows
+        data = array('d')
+        for row in rows:
+            data.extend(row)
+        width = len(rows[0]) if len(rows) else 0
+        return cls(data, (len(rows), width))
+
+    @classmethod
+    def zeros(cls, shape):
+        """Builds a contiguous Matrix filled with zeros"""
+        return cls(array('d', bytes(8 * shape[0] * shape[1])), shape)
+
+    def __len__(self):
+        """Number of rows"""
+        return self.shape[0]
+
+    def __repr__(self):
+        """Representation as the equivalent list of lists"""
+        return 'Matrix({})'.format(self.tolist())
+
+    def __eq__(self, other):
+        """Two matrices are equal if they hold the same values"""
+        if isinstance(other, Matrix):
+            other = other.tolist()
+        return self.tolist() == other
+
+    @property
+    def is_contiguous(self):
+        """True if the view covers its buffer in row-major order"""
+        return (self.strides == (self.shape[1], 1) and self.offset == 0 and
+                len(self.data) == self.shape[0] * self.shape[1])
+
+    @property
+    def T(self):
+        """Zero-copy transposed view"""
+        return Matrix(self.data, self.shape[::-1], self.strides[::-1],
+                      self.offset)
+
+    def transpose(self):
+        """Zero-copy transposed view"""
+        return self.T
+
+    def row(self, i):
+        """Returns row i as an array('d')"""
+        if i < 0:
+            i += self.shape[0]
+        if not 0 <= i < self.shape[0]:
+            raise IndexError('row index out of range')
+        start = self.offset + i * self.strides[0]
+        step = self.strides[1]
+        if step == 1:
+            return self.data[start:start + self.shape[1]]
+        return array('d', (self.data[start + j * step]
+                           for j in range(self.shape[1])))
+
+    def rows(self):
+        """Iterates over the rows as array('d')"""
+        for i in range(self.shape[0]):
+            yield self.row(i)
+
+    def flat(self):
+        """Returns the elements in row-major order as an array('d')"""
+        if self.is_contiguous:
+            return self.data
+        out = array('d')
+        for row in self.rows():
+            out.extend(row)
+        return out
+
+    def copy(self):
+        """Returns a contiguous copy that owns its buffer"""
+        return Matrix(array('d', self.flat()), self.shape)
+
+    def tolist(self):
+        """Returns the matrix as a list of lists"""
+        return [row.tolist() for row in self.rows()]
+
+    def __getitem__(self, key):
+        """
+        m[i] returns a MatrixRow over the shared buffer so m[i][j]
+        reads and m[i][j] = v writes like a list of lists, m[i, j]
+        returns a single value and any slice returns a view
+        """
+        if not isinstance(key, tuple):
+            if isinstance(key, slice):
+                return self[key, :]
+            return MatrixRow(self, self._index(key, 0))
+        i, j = key
+        if isinstance(i, slice) or isinstance(j, slice):
+            i_start, i_step, rows = self._axis(i, 0)
+            j_start, j_step, cols = self._axis(j, 1)
+            offset = (self.offset + i_start * self.strides[0] +
+                      j_start * self.strides[1])
+            strides = (self.strides[0] * i_step, self.strides[1] * j_step)
+            return Matrix(self.data, (rows, cols), strides, offset)
+        return self.data[self.offset + self._index(i, 0) * self.strides[0] +
+                         self._index(j, 1) * self.strides[1]]
+
+    def __setitem__(self, key, value):
+        """Writes a single value at m[i, j]"""
+        i, j = key
+        self.data[self.offset + self._index(i, 0) * self.strides[0] +
+                  self._index(j, 1) * self.strides[1]] = value
+
+    def _index(self, i, axis):
+        """Normalizes an integer index along an axis"""
+        if i < 0:
+            i += self.shape[axis]
+        if not 0 <= i < self.shape[axis]:
+            raise IndexError('matrix index out of range')
+        return i
+
+    def _axis(self, key, axis):
+        """Returns (start, step, length) of an index or slice on an axis"""
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.shape[axis])
+            return start, step, len(range(start, stop, step))
+        return self._index(key, axis), 1, 1
+
+    def add(self, other):
+        """Element-wise sum, None if the shapes differ"""
+        if self.shape != other.shape:
+            return None
+        return Matrix(array('d', map(add, self.flat(), other.flat())),
+                      self.shape)
+
+    def concat(self, other, axis=0):
+        """Concatenation along axis 0 or 1, None if the shapes differ"""
+        if axis == 0:
+            if self.shape[1] != other.shape[1]:
+                return None
+            data = array('d', self.flat())
+            data.extend(other.flat())
+            return Matrix(data, (self.shape[0] + other.shape[0],
+                                 self.shape[1]))
+        if axis == 1:
+            if self.shape[0] != other.shape[0]:
+                return None
+            data = array('d')
+            for row1, row2 in zip(self.rows(), other.rows()):
+                data.extend(row1)
+                data.extend(row2)
+            return Matrix(data, (self.shape[0],
+                                 self.shape[1] + other.shape[1]))
+        return None
+
+    def matmul(self, other):
+        """Matrix product, None if the inner dimensions differ"""
+        if self.shape[1] != other.shape[0]:
+            return None
+        product = multiply_rows(list(self.rows()), list(other.T.rows()))
+        data = array('d')
+        for row in product:
+            data.extend(row)
+        return Matrix(data, (self.shape[0], other.shape[1]))
+
+
+class MatrixRow:
+    """Row i of a Matrix, reading and writing through its buffer"""
+
+    __slots__ = ('matrix', 'i')
+
+    def __init__(self, matrix, i):
+        """
+        Args:
+            matrix: the Matrix owning the row
+            i: index of the row in the matrix
+        """
+        self.matrix = matrix
+        self.i = i
+
+    def __len__(self):
+        """Number of columns"""
+        return self.matrix.shape[1]
+
+    def __getitem__(self, j):
+        """Returns one element, or a list for a slice"""
+        if isinstance(j, slice):
+            return [self.matrix[self.i, k]
+                    for k in range(*j.indices(len(self)))]
+        return self.matrix[self.i, j]
+
+    def __setitem__(self, j, value):
+        """Writes one element into the matrix buffer"""
+        self.matrix[self.i, j] = value
+
+    def __iter__(self):
+        """Iterates over the elements of the row"""
+        for j in range(len(self)):
+            yield self[j]
+
+    def __eq__(self, other):
+        """Compares as the equivalent list"""
+        if isinstance(other, (MatrixRow, array)):
+            other = list(other)
+        return list(self) == other
+
+    def __repr__(self):
+        """Representation as the equivalent list"""
+        return repr(list(self))
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+    Lazy transpose and concatenation views over lists of lists
+    TransposeView = __import__('lazy_views').TransposeView
+    ConcatView = __import__('lazy_views').ConcatView
+"""
+
+
+from abc import ABC, abstractmethod
+
+
+class LazyView(ABC):
+    """
+    Read-only proxy that looks like a list of lists
+
+    Reads are answered from the original matrices. The first write,
+    or an explicit call to materialize(), builds the real list of
+    lists once and every later access goes to that copy
+    """
+
+    __slots__ = ('_data',)
+
+    def __init__(self):
+        """Nothing is materialized yet"""
+        self._data = None
+
+    def _build(self):
+        """Returns the materialized list of lists"""
+        return [[self._get(i, j) for j in range(self._width())]
+                for i in range(len(self))]
+
+    @abstractmethod
+    def _get(self, i, j):
+        """Returns the element (i, j) from the original matrices"""
+
+    @abstractmethod
+    def _width(self):
+        """Returns the number of columns of the view"""
+
+    @property
+    def shape(self):
+        """Tuple of (rows, columns)"""
+        if self._data is not None:
+            return (len(self._data), len(self._data[0]))
+        return (len(self), self._width())
+
+    @property
+    def materialized(self):
+        """True once the view owns a real list of lists"""
+        return self._data is not None
+
+    def materialize(self):
+        """Builds the list of lists if needed and returns it"""
+        if self._data is None:
+            self._data = self._build()
+        return self._data
+
+    def tolist(self):
+        """Returns the view as a list of lists"""
+        return self.materialize()
+
+    @abstractmethod
+    def __len__(self):
+        """Number of rows"""
+
+    def __getitem__(self, i):
+        """Returns a row proxy, or a list of rows for a slice"""
+        if self._data is not None:
+            return self._data[i]
+        if isinstance(i, slice):
+            return [list(self[k]) for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('list index out of range')
+        return RowView(self, i)
+
+    def __setitem__(self, i, row):
+        """Writing a row materializes the view first"""
+        self.materialize()[i] = row
+
+    def __iter__(self):
+        """Iterates over the rows"""
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, other):
+        """Compares as the equivalent list of lists"""
+        return [list(row) for row in self] == other
+
+    def __repr__(self):
+        """Representation as the equivalent list of lists"""
+        return repr([list(row) for row in self])
+
+
+class RowView:
+    """Proxy for a single row of a LazyView"""
+
+    __slots__ = ('view', 'i')
+
+    def __init__(self, view, i):
+        """
+        Args:
+            view: the LazyView owning the row
+            i: index of the row in the view
+        """
+        self.view = view
+        self.i = i
+
+    def __len__(self):
+        """Number of columns"""
+        return self.view._width()
+
+    def __getitem__(self, j):
+        """Returns one element, or a list for a slice"""
+        view = self.view
+        if view._data is not None:
+            return view._data[self.i][j]
+        if isinstance(j, slice):
+            return [view._get(self.i, k)
+                    for k in range(*j.indices(len(self)))]
+        if j < 0:
+            j += len(self)
+        if not 0 <= j < len(self):
+            raise IndexError('list index out of range')
+        return view._get(self.i, j)
+
+    def __setitem__(self, j, value):
+        """Writing an element materializes the view first"""
+        self.view.materialize()[self.i][j] = value
+
+    def __iter__(self):
+        """Iterates over the elements of the row"""
+        for j in range(len(self)):
+            yield self[j]
+
+    def __eq__(self, other):
+        """Compares as the equivalent list"""
+        return list(self) == other
+
+    def __repr__(self):
+        """Representation as the equivalent list"""
+        return repr(list(self))
+
+
+class TransposeView(LazyView):
+    """Transpose of a 2D list of lists that swaps indices on read"""
+
+    __slots__ = ('base',)
+
+    def __init__(self, base):
+        """
+        Args:
+            base: list of lists to transpose
+        """
+        super().__init__()
+        self.base = base
+
+    def __len__(self):
+        """Number of rows, the columns of the base"""
+        if self._data is not None:
+            return len(self._data)
+        return len(self.base[0])
+
+    def _width(self):
+        """Number of columns, the rows of the base"""
+        return len(self.base)
+
+    def _get(self, i, j):
+        """Element (i, j) is the element (j, i) of the base"""
+        return self.base[j][i]
+
+
+class ConcatView(LazyView):
+    """Rope over two 2D lists of lists concatenated along an axis"""
+
+    __slots__ = ('mat1', 'mat2', 'axis', '_split')
+
+    def __init__(self, mat1, mat2, axis=0):
+        """
+        Args:
+            mat1: first list of lists
+            mat2: second list of lists
+            axis: 0 to stack the rows, 1 to join the columns
+        """
+        super().__init__()
+        self.mat1 = mat1
+        self.mat2 = mat2
+        self.axis = axis
+        self._split = len(mat1) if axis == 0 else len(mat1[0])
+
+    def __len__(self):
+        """Number of rows"""
+        if self._data is not None:
+            return len(self._data)
+        if self.axis == 0:
+            return len(self.mat1) + len(self.mat2)
+        return len(self.mat1)
+
+    def _width(self):
+        """Number of columns"""
+        if self.axis == 0:
+            return len(self.mat1[0])
+        return len(self.mat1[0]) + len(self.mat2[0])
+
+    def _get(self, i, j):
+        """Reads the element from whichever matrix holds it"""
+        if self.axis == 0:
+            if i < self._split:
+                return self.mat1[i][j]
+            return self.mat2[i - self._split][j]
+        if j < self._split:
+            return self.mat1[i][j]
+        return self.mat2[i][j - self._split]
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+    Blocked matrix multiplication engine for lists of lists
+    matmul = __import__('matmul_engine').matmul
+"""
+
+
+from concurrent.futures import ProcessPoolExecutor
+
+
+TransposeView = __import__('lazy_views').TransposeView
+
+
+BLOCK_SIZE = 128
+PARALLEL_THRESHOLD = 256 ** 3
+
+_shared_cols = None
+
+
+def transpose(mat2):
+    """Return the columns of mat2 as a list of row-contiguous tuples"""
+    if isinstance(mat2, TransposeView) and not mat2.materialized:
+        # the columns of a transpose view are the rows of its base
+        return mat2.base
+    return list(zip(*mat2))
+
+
+def multiply_rows(rows, cols, block=BLOCK_SIZE):
+    """
+    Multiplies a block of rows by an already transposed matrix
+
+    Args:
+        rows: list of rows of the left matrix
+        cols: list of columns of the right matrix (its transpose)
+        block: edge length of the i, j and k tiles
+
+    Returns:
+        list of lists containing the product rows
+    """
+    width = len(cols)
+    inner = len(cols[0]) if cols else 0
+    result = [[0] * width for _ in rows]
+    for i0 in range(0, len(rows), block):
+        row_tile = rows[i0:i0 + block]
+        out_tile = result[i0:i0 + block]
+        for j0 in range(0, width, block):
+            col_tile = cols[j0:j0 + block]
+            for k0 in range(0, inner, block):
+                k1 = k0 + block
+                segments = [col[k0:k1] for col in col_tile]
+                for row, out in zip(row_tile, out_tile):
+                    seg = row[k0:k1]
+                    j = j0
+                    for col in segments:
+                        # accumulate in k order with plain additions
+                        # like the naive loop; sum() compensates float
+                        # rounding since Python 3.12 and would differ
+                        total = out[j]
+                        for a, b in zip(seg, col):
+                            total += a * b
+                        out[j] = total
+                        j += 1
+    return result
+
+
+def _init_worker(cols):
+    """Stores the transposed right matrix once per worker process"""
+    global _shared_cols
+    _shared_cols = cols
+
+
+def _worker(args):
+    """Multiplies one row band against the shared columns"""
+    rows, block = args
+    return multiply_rows(rows, _shared_cols, block)
+
+
+def matmul(mat1, mat2, block=BLOCK_SIZE, workers=None):
+    """
+    Performs matrix multiplication of two lists of lists
+
+    Args:
+        mat1: list of lists of shape (n, m)
+        mat2: list of lists of shape (m, p)
+        block: edge length of the cache tiles
+        workers: number of processes to use, None lets the engine
+            decide from the size of the product, 1 forces a single
+            process
+
+    Returns:
+        a new list of lists of shape (n, p), or None if the
+        number of columns of mat1 differs from the rows of mat2
+    """
+    if len(mat1[0]) != len(mat2):
+        return None
+    cols = transpose(mat2)
+    work = len(mat1) * len(mat2) * len(cols)
+    if workers is None and work < PARALLEL_THRESHOLD:
+        workers = 1
+    if workers == 1 or len(mat1) <= block:
+        return multiply_rows(mat1, cols, block)
+
+    bands = [(mat1[i:i + block], block) for i in range(0, len(mat1), block)]
+    result = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cols,)) as pool:
+        for band in pool.map(_worker, bands):
+            result.extend(band)
+    return result
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+    Helpers to stream numpy operations through memory-mapped arrays
+    open_output = __import__('out_of_core').open_output
+"""
+
+
+import numpy as np
+
+
+PANEL_BYTES = 64 * 1024 * 1024
+
+
+def open_output(out, shape, dtype):
+    """
+    Returns the array receiving a streamed result
+
+    Args:
+        out: a path to a .npy file to create as a memmap, or an
+            existing array or memmap of the right shape
+        shape: shape of the result
+        dtype: dtype of the result
+
+    Returns:
+        the output array
+    """
+    if isinstance(out, np.ndarray):
+        if out.shape != tuple(shape):
+            raise ValueError("out must have the shape {}".format(shape))
+        return out
+    return np.lib.format.open_memmap(out, mode='w+', dtype=dtype,
+                                     shape=tuple(shape))
+
+
+def panel_rows(row_bytes, panel_bytes=PANEL_BYTES):
+    """Returns how many rows of row_bytes fit in one panel"""
+    return max(1, int(panel_bytes // max(row_bytes, 1)))
+
+
+def copy_panels(dst, src, panel_bytes=PANEL_BYTES):
+    """Copies src into dst panel by panel along the first axis"""
+    if src.shape[0] == 0:
+        return
+    rows = panel_rows(src[:1].nbytes, panel_bytes)
+    for start in range(0, src.shape[0], rows):
+        dst[start:start + rows] = src[start:start + rows]
+
+
+def flush(out):
+    """Writes a memmapped result back to its file"""
+    if isinstance(out, np.memmap):
+        out.flush()
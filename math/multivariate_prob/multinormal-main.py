@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+
+import time
+import numpy as np
+MultiNormal = __import__('multinormal').MultiNormal
+
+
+if __name__ == "__main__":
+    np.random.seed(0)
+    x = np.random.randn(1, 100)
+    collinear = MultiNormal(np.vstack([x, x + 1e-5 * np.random.randn(1, 100)]))
+    assert np.isfinite(collinear.pdf(collinear.mean)), collinear.cov
+    try:
+        MultiNormal(np.vstack([x, 2 * x])).pdf(collinear.mean)
+        raise AssertionError("duplicated dimension accepted")
+    except np.linalg.LinAlgError as error:
+        print("nearly collinear cov accepted, collinear cov:", error)
+
+    cov = [[36, -30, 15], [-30, 100, -20], [15, -20, 25]]
+    data = np.random.multivariate_normal([12, 30, 10], cov, 10000).T
+    mn = MultiNormal(data)
+    X = np.random.multivariate_normal([12, 30, 10], cov, 1000000).T
+
+    start = time.perf_counter()
+    single = [mn.pdf(X[:, j:j + 1]) for j in range(10000)]
+    loop = (time.perf_counter() - start) * X.shape[1] / 10000
+    start = time.perf_counter()
+    batch = mn.pdf(X)
+    print("{} points: loop ~{:.1f}s, batch {:.3f}s".format(
+        X.shape[1], loop, time.perf_counter() - start))
+    print("batch identical to single points:",
+          np.array_equal(batch[:10000], single))
@@ -8,6 +8,13 @@
 import numpy as np
 
 
+"""Smallest Cholesky diagonal kept, relative to the standard deviation
+of its dimension and times sqrt(d); an exact linear combination of the
+previous dimensions leaves about sqrt(d * eps) from rounding, so below
+it cov is treated as singular"""
+SINGULAR_RTOL = 4 * np.sqrt(np.finfo(float).eps)
+
+
 class MultiNormal:
     """
     class MultiNormal that represents
@@ -31,32 +38,76 @@ class MultiNormal:
         self.mean = mean
         cov = np.matmul(data - mean, data.T - mean.T) / (n - 1)
         self.cov = cov
+        self._factor_of = None
 
-    def pdf(self, x):
+    def _factor(self):
+        """
+        Cholesky factor L of cov and the log normalizing constant
+        -(d * log(2 * pi) + log(det(cov))) / 2, computed on first use
+        and again only if cov is replaced
+
+        Raises:
+            numpy.linalg.LinAlgError('Singular matrix') if cov is
+            singular or nearly so
         """
-        calculates the PDF at a data point
+        if self._factor_of is not self.cov:
+            try:
+                cholesky = np.linalg.cholesky(self.cov)
+            except np.linalg.LinAlgError:
+                raise np.linalg.LinAlgError("Singular matrix")
+            scale = np.sqrt(self.cov.shape[0] * np.diag(self.cov))
+            if np.any(np.diag(cholesky) <= SINGULAR_RTOL * scale):
+                raise np.linalg.LinAlgError("Singular matrix")
+            log_det = 2 * np.sum(np.log(np.diag(cholesky)))
+            self._cholesky = cholesky
+            self._log_norm = -0.5 * (cholesky.shape[0] * np.log(2 * np.pi) +
+                                     log_det)
+            self._factor_of = self.cov
+        return self._cholesky, self._log_norm
+
+    def logpdf(self, x):
+        """
+        calculates the log of the PDF at one or several data points
+
+        The squared Mahalanobis distance is |z|^2 for L z = x - mean,
+        solved by forward substitution on the cached Cholesky factor.
+        The substitution only uses element-wise operations, so every
+        column gets the same result alone or within a batch.
 
         Args:
-            x is a numpy.ndarray of shape (d,) containing the data point
-                whose PDF should be calculated
+            x is a numpy.ndarray of shape (d, 1), or (d, n) for n
+                data points
                 d is the number of dimensions of the Multinomial instance
 
         Returns:
-            the PDF at x
+            the log PDF at x, a numpy.ndarray of shape (n,) for a batch
         """
         if type(x) is not np.ndarray:
             raise TypeError("x must be a numpy.ndarray")
         d = self.cov.shape[0]
-        if len(x.shape) != 2:
-            raise ValueError("x must have the shape ({}, 1)".format(d))
-        test_d, one = x.shape
-        if test_d != d or one != 1:
+        if len(x.shape) != 2 or x.shape[0] != d or x.shape[1] < 1:
             raise ValueError("x must have the shape ({}, 1)".format(d))
 
-        det = np.linalg.det(self.cov)
-        inv = np.linalg.inv(self.cov)
-        pdf = 1.0 / np.sqrt(((2 * np.pi) ** d) * det)
-        mult = np.matmul(np.matmul((x - self.mean).T, inv), (x - self.mean))
-        pdf *= np.exp(-0.5 * mult)
-        pdf = pdf[0][0]
-        return pdf
+        cholesky, log_norm = self._factor()
+        z = np.subtract(x, self.mean, dtype=float)
+        distance = np.zeros(x.shape[1])
+        for i in range(d):
+            z[i] /= cholesky[i, i]
+            z[i + 1:] -= cholesky[i + 1:, i:i + 1] * z[i]
+            distance += z[i] * z[i]
+        logpdf = log_norm - 0.5 * distance
+        return logpdf[0] if x.shape[1] == 1 else logpdf
+
+    def pdf(self, x):
+        """
+        calculates the PDF at one or several data points
+
+        Args:
+            x is a numpy.ndarray of shape (d, 1), or (d, n) for n
+                data points
+                d is the number of dimensions of the Multinomial instance
+
+        Returns:
+            the PDF at x, a numpy.ndarray of shape (n,) for a batch
+        """
+        return np.exp(self.logpdf(x))
@@ -4,15 +4,26 @@
 '''
 
 
-class Binomial:
+from math import floor, lgamma, log, log1p, sqrt
+import numpy as np
+engine = __import__('prob_engine')
+
+
+class Binomial(engine.OnlineFit):
     '''
         Binomial distribution class
     '''
 
-    def __init__(self, data=None, n=1, p=0.5):
+    def __init__(self, data=None, n=1, p=0.5, k_max=64):
         '''
             Class constructor
+
+            k_max is the largest k of the PMF/CDF lookup table built
+            on the first pmf/cdf call; the table grows past it on
+            demand
         '''
+        self.k_max = k_max
+        self._table = None
         if data is None:
             if n < 1:
                 raise ValueError("n must be a positive value")
@@ -27,57 +38,146 @@ class Binomial:
                 raise TypeError('data must be a list')
             if len(data) < 2:
                 raise ValueError('data must contain multiple values')
-            mean = float(sum(data) / len(data))
-            summation = 0
-            for x in data:
-                summation += ((x - mean) ** 2)
-            variance = (summation / len(data))
-            q = variance / mean
-            p = (1 - q)
-            n = round(mean / p)
-            p = float(mean / n)
-            self.n = n
-            self.p = p
+            self.moments = engine.Moments().update(data)
+            self._fit()
+
+    def _fit(self):
+        '''
+            Sets n and p from the accumulated moments
+        '''
+        mean = self.moments.mean
+        q = self.moments.variance / mean
+        p = (1 - q)
+        n = round(mean / p)
+        p = float(mean / n)
+        self.n = n
+        self.p = p
+
+    def log_pmf(self, k):
+        '''
+            Calculates log(PMF) for whole numbers 0 <= k <= n,
+            a number or a numpy.ndarray
+        '''
+        n = self.n
+        if engine.is_batch(k):
+            log_choose = -(engine.lgamma_array(k + 1) +
+                           engine.lgamma_array(n - k + 1))
+        else:
+            log_choose = -(lgamma(k + 1) + lgamma(n - k + 1))
+        return (lgamma(n + 1) + log_choose + k * log(self.p) +
+                (n - k) * log1p(-self.p))
+
+    def table(self):
+        '''
+            Returns the PMF/CDF lookup table, built on first use and
+            rebuilt if n or p changed
+        '''
+        params = (self.n, self.p)
+        if self._table is None or self._table.params != params:
+            self._table = engine.CDFTable(self.log_pmf, self.n, self.k_max,
+                                          params)
+        return self._table
+
+    def cache_info(self):
+        '''
+            Returns the hits, misses, hit ratio, size and memory in
+            bytes of the lookup table
+        '''
+        return self.table().cache_info()
 
     def pmf(self, k):
         '''
             Calculates the value of the
             PMF for a given number of successes
+
+            k can also be a list or numpy.ndarray, the result is
+            then a numpy.ndarray
         '''
+        if engine.is_batch(k):
+            k, valid = engine.counts(k, truncate_first=True)
+            valid &= k <= self.n
+            table = self.table()
+            k = table.lookup_batch(np.where(valid, k, 0).astype(int))
+            return np.where(valid, table.pmf[k], 0.)
         if type(k) is not int:
             k = int(k)
         if k < 0:
             return 0
-        p = self.p
-        n = self.n
-        q = (1 - p)
-        n_factorial = 1
-        for i in range(n):
-            n_factorial *= (i + 1)
-        k_factorial = 1
-        for i in range(k):
-            k_factorial *= (i + 1)
-        nk_factorial = 1
-        for i in range(n - k):
-            nk_factorial *= (i + 1)
-        binomial_co = n_factorial / (k_factorial * nk_factorial)
-        pmf = binomial_co * (p ** k) * (q ** (n - k))
-        return pmf
+        if k > self.n:
+            return 0.
+        table = self.table()
+        k = table.lookup(k)
+        return float(table.pmf[k])
 
     def cdf(self, k):
         '''
             Calculates the value of the
             CDF for a given number of successes
+
+            k can also be a list or numpy.ndarray, the result is
+            then a numpy.ndarray
         '''
+        if engine.is_batch(k):
+            k, valid = engine.counts(k, truncate_first=True)
+            table = self.table()
+            k = table.lookup_batch(np.minimum(k, self.n).astype(int))
+            return np.where(valid, table.cdf[k], 0.)
         if type(k) is not int:
             k = int(k)
         if k < 0:
             return 0
-        p = self.p
-        n = self.n
-        q = (1 - p)
-        summation = 0
-        for i in range(k + 1):
-            summation += self.pmf(i)
-        cdf = summation
-        return cdf
+        table = self.table()
+        k = table.lookup(k)
+        return float(table.cdf[k])
+
+    def sample(self, n, rng=None):
+        '''
+            Draws n numbers of successes as an int numpy.ndarray
+
+            rng is a numpy.random.Generator or a seed, None for
+            fresh entropy
+            When self.n * min(p, 1 - p) < 10 uniforms are inverted through
+            the CDF table, above Hormann's BTRS transformed rejection
+            is used on min(p, 1 - p), which accepts about 90% of its
+            proposals
+        '''
+        rng = np.random.default_rng(rng)
+        trials = int(self.n)
+        p = min(self.p, 1 - self.p)
+        q = 1 - p
+        if trials * p < 10:
+            table = self.table()
+            table.extend(trials * self.p + 40 * sqrt(trials * p * q) + 40)
+            return table.quantiles(engine.uniforms(rng, n)).astype(np.int64)
+        spq = sqrt(trials * p * q)
+        b = 1.15 + 2.53 * spq
+        a = -0.0873 + 0.0248 * b + 0.01 * p
+        c = trials * p + 0.5
+        v_r = 0.92 - 4.2 / b
+        alpha = (2.83 + 5.1 / b) * spq
+        log_pq = log(p / q)
+        m = floor((trials + 1) * p)
+        h = lgamma(m + 1) + lgamma(trials - m + 1)
+
+        def propose(rng, count):
+            '''BTRS proposals and their acceptance mask'''
+            u = engine.uniforms(rng, count) - 0.5
+            v = engine.uniforms(rng, count)
+            us = 0.5 - np.abs(u)
+            k = np.floor((2 * a / us + b) * u + c)
+            inside = (k >= 0) & (k <= trials)
+            accepted = inside & (us >= 0.07) & (v <= v_r)
+            check = inside & ~accepted
+            k_check = k[check]
+            us = us[check]
+            accepted[check] = (np.log(v[check] * alpha /
+                                      (a / (us * us) + b)) <=
+                               h - engine.lgamma_array(k_check + 1) -
+                               engine.lgamma_array(trials - k_check + 1) +
+                               (k_check - m) * log_pq)
+            return k.astype(np.int64), accepted
+
+        draws = engine.rejection_sample(n, rng, propose)
+        if self.p > 0.5:
+            return trials - draws
+        return draws
@@ -2,7 +2,11 @@
 """Represents an exponential distribution."""
 
 
-class Exponential:
+import numpy as np
+engine = __import__('prob_engine')
+
+
+class Exponential(engine.OnlineFit):
     """
     Represents an exponential distribution.
 
@@ -22,15 +26,30 @@ class Exponential:
                 raise TypeError("data must be a list")
             if len(data) < 2:
                 raise ValueError("data must contain multiple values")
-            self.lambtha = 1 / (sum(data) / len(data))
-            if self.lambtha <= 0:
-                raise ValueError("lambtha must be a positive value")
+            self.moments = engine.Moments().update(data)
+            self._fit()
+
+    def _fit(self):
+        """
+        Sets lambtha from the accumulated moments.
+
+        """
+        self.lambtha = 1 / self.moments.mean
+        if self.lambtha <= 0:
+            raise ValueError("lambtha must be a positive value")
 
     def pdf(self, x):
         """
         Calculates the value of the PDF for a given time period.
 
+        x can also be a list or numpy.ndarray, the result is then
+        a numpy.ndarray.
+
         """
+        if engine.is_batch(x):
+            x = np.asarray(x, dtype=float)
+            return np.where(x < 0, 0., self.lambtha * 2.7182818285 ** (
+                -self.lambtha * np.maximum(x, 0)))
         if x < 0:
             return 0
         else:
@@ -40,12 +59,31 @@ class Exponential:
         """
         Calculates the value of the CDF for a given time period.
 
+        x can also be a list or numpy.ndarray, the result is then
+        a numpy.ndarray.
+
         """
+        if engine.is_batch(x):
+            x = np.asarray(x, dtype=float)
+            return np.where(x < 0, 0., 1 - 2.7182818285 ** (
+                -self.lambtha * np.maximum(x, 0)))
         if x < 0:
             return 0
         else:
             return 1 - 2.7182818285 ** (-self.lambtha * x)
 
+    def sample(self, n, rng=None):
+        """
+        Draws n waiting times as a numpy.ndarray by inverse
+        transform, -log(U) / lambtha.
+
+        rng is a numpy.random.Generator or a seed, None for fresh
+        entropy.
+
+        """
+        rng = np.random.default_rng(rng)
+        return -np.log(engine.uniforms(rng, n)) / self.lambtha
+
 
 # Test cases
 if __name__ == "__main__":
@@ -4,7 +4,12 @@
 '''
 
 
-class Normal:
+from math import erfc, exp, pi, sqrt
+import numpy as np
+engine = __import__('prob_engine')
+
+
+class Normal(engine.OnlineFit):
     '''
         Class Normal that represents
         a normal distribution
@@ -26,13 +31,15 @@ class Normal:
             elif len(data) < 2:
                 raise ValueError("data must contain multiple values")
             else:
-                mean = float(sum(data) / len(data))
-                self.mean = mean
-                summation = 0
-                for x in data:
-                    summation += ((x - mean) ** 2)
-                stddev = (summation / len(data)) ** (1 / 2)
-                self.stddev = stddev
+                self.moments = engine.Moments().update(data)
+                self._fit()
+
+    def _fit(self):
+        '''
+            Sets mean and stddev from the accumulated moments
+        '''
+        self.mean = self.moments.mean
+        self.stddev = sqrt(self.moments.variance)
 
     def z_score(self, x):
         '''
@@ -50,27 +57,68 @@ class Normal:
         '''
             Calculates the value of the
             PDF for a given x-value
+
+            x can also be a list or numpy.ndarray, the result is
+            then a numpy.ndarray
         '''
-        mean = self.mean
-        stddev = self.stddev
-        e = 2.7182818285
-        pi = 3.1415926536
-        power = -0.5 * (self.z_score(x) ** 2)
-        coefficient = 1 / (stddev * ((2 * pi) ** (1 / 2)))
-        pdf = coefficient * (e ** power)
-        return pdf
+        coefficient = 1 / (self.stddev * sqrt(2 * pi))
+        if engine.is_batch(x):
+            z = self.z_score(np.asarray(x, dtype=float))
+            return coefficient * np.exp(-0.5 * z * z)
+        z = self.z_score(x)
+        return coefficient * exp(-0.5 * z * z)
 
     def cdf(self, x):
         '''
             Calculates the value of the
             CDF for a given x-value
+
+            Uses erfc, which stays accurate far into both tails
+
+            x can also be a list or numpy.ndarray, the result is
+            then a numpy.ndarray
+        '''
+        if engine.is_batch(x):
+            z = self.z_score(np.asarray(x, dtype=float))
+            return 0.5 * engine.erfc_array(-z / sqrt(2))
+        return 0.5 * erfc(-self.z_score(x) / sqrt(2))
+
+    def ppf(self, p):
+        '''
+            Calculates the x-value below which a given
+            fraction p of the distribution lies (inverse CDF)
+
+            p can also be a list or numpy.ndarray, the result is
+            then a numpy.ndarray; p = 0 and p = 1 give -inf and inf,
+            p outside [0, 1] gives nan
+        '''
+        return self.x_value(engine.standard_normal_ppf(p))
+
+    def x_value_from_p(self, p):
+        '''
+            Calculates the x-value of a given cumulative
+            probability p, same as ppf
+        '''
+        return self.ppf(p)
+
+    def sample(self, n, rng=None, method='ppf'):
+        '''
+            Draws n values as a numpy.ndarray
+
+            rng is a numpy.random.Generator or a seed, None for
+            fresh entropy
+            method 'ppf' applies ppf to a buffer of n uniforms in
+            (0, 1), 'box_muller' turns pairs of uniforms into pairs
+            of normals with the Box-Muller transform, which is faster
         '''
-        mean = self.mean
-        stddev = self.stddev
-        pi = 3.1415926536
-        value = (x - mean) / (stddev * (2 ** (1 / 2)))
-        val = value - ((value ** 3) / 3) + ((value ** 5) / 10)
-        val = val - ((value ** 7) / 42) + ((value ** 9) / 216)
-        val *= (2 / (pi ** (1 / 2)))
-        cdf = (1 / 2) * (1 + val)
-        return cdf
+        rng = np.random.default_rng(rng)
+        if method == 'ppf':
+            return self.ppf(engine.uniforms(rng, n))
+        if method != 'box_muller':
+            raise ValueError("method must be 'ppf' or 'box_muller'")
+        pairs = (n + 1) // 2
+        radius = np.sqrt(-2 * np.log(engine.uniforms(rng, pairs)))
+        angle = 2 * pi * engine.uniforms(rng, pairs)
+        z = np.concatenate((radius * np.cos(angle),
+                            radius * np.sin(angle)))[:n]
+        return self.x_value(z)
@@ -5,7 +5,12 @@
 '''
 
 
-class Poisson:
+from math import exp, lgamma, log, sqrt
+import numpy as np
+engine = __import__('prob_engine')
+
+
+class Poisson(engine.OnlineFit):
     '''
         Class Poisson that represents a
         distribution of Poisson
@@ -21,10 +26,16 @@ class Poisson:
             return 1
         return k * self.factorial(k - 1)
 
-    def __init__(self, data=None, lambtha=1.):
+    def __init__(self, data=None, lambtha=1., k_max=64):
         '''
             Class constructor
+
+            k_max is the largest k of the PMF/CDF lookup table built
+            on the first pmf/cdf call; the table grows past it on
+            demand
         '''
+        self.k_max = k_max
+        self._table = None
         if data is None:
             if lambtha <= 0:
                 raise ValueError('lambtha must be a positive value')
@@ -34,30 +45,134 @@ class Poisson:
                 raise TypeError('data must be a list')
             if len(data) < 2:
                 raise ValueError('data must contain multiple values')
-            self.lambtha = float(sum(data) / len(data))
+            self.moments = engine.Moments().update(data)
+            self._fit()
+
+    def _fit(self):
+        '''
+            Sets lambtha from the accumulated moments
+        '''
+        self.lambtha = self.moments.mean
+
+    def log_pmf(self, k):
+        '''
+            Calculates log(PMF) for whole numbers k >= 0,
+            a number or a numpy.ndarray
+        '''
+        if engine.is_batch(k):
+            log_factorial = engine.lgamma_array(k + 1)
+        else:
+            log_factorial = lgamma(k + 1)
+        return k * log(self.lambtha) - self.lambtha - log_factorial
+
+    def table(self):
+        '''
+            Returns the PMF/CDF lookup table, built on first use and
+            rebuilt if lambtha changed
+        '''
+        params = (self.lambtha,)
+        if self._table is None or self._table.params != params:
+            self._table = engine.CDFTable(self.log_pmf, self._tail_start(),
+                                          self.k_max, params)
+        return self._table
+
+    def cache_info(self):
+        '''
+            Returns the hits, misses, hit ratio, size and memory in
+            bytes of the lookup table
+        '''
+        return self.table().cache_info()
+
+    def _tail_start(self):
+        '''
+            Number of successes past which the PMF is below the
+            smallest float, so the CDF no longer changes
+        '''
+        return int(self.lambtha + 40 * sqrt(self.lambtha) + 40)
 
     def pmf(self, k):
         '''
             Calculates the value of the
             PMF for a given number of successes
+
+            k can also be a list or numpy.ndarray, the result is
+            then a numpy.ndarray
         '''
+        if engine.is_batch(k):
+            k, valid = engine.counts(k, truncate_first=False)
+            table = self.table()
+            index = table.lookup_batch(np.minimum(k, table.last).astype(int))
+            pmf = table.pmf[index]
+            beyond = k > table.last
+            if beyond.any():
+                pmf[beyond] = np.exp(self.log_pmf(k[beyond]))
+            return np.where(valid, pmf, 0.)
         if k < 0:
             return 0
         k = int(k)
-        e = 2.7182818285
-        return ((self.lambtha ** k) * (e ** (-self.lambtha))
-                ) / (self.factorial(k))
+        table = self.table()
+        if k > table.last:
+            return exp(self.log_pmf(k))
+        k = table.lookup(k)
+        return float(table.pmf[k])
 
     def cdf(self, k):
         '''
             Calculates the value of the
             CDF for a given number of successes
+
+            k can also be a list or numpy.ndarray, the result is
+            then a numpy.ndarray
         '''
+        if engine.is_batch(k):
+            k, valid = engine.counts(k, truncate_first=True)
+            table = self.table()
+            k = table.lookup_batch(np.minimum(k, table.last).astype(int))
+            return np.where(valid, table.cdf[k], 0.)
         if type(k) is not int:
             k = int(k)
         if k < 0:
             return 0
-        cdf = 0
-        for i in range(k + 1):
-            cdf += self.pmf(i)
-        return cdf
+        table = self.table()
+        k = table.lookup(k)
+        return float(table.cdf[k])
+
+    def sample(self, n, rng=None):
+        '''
+            Draws n numbers of successes as an int numpy.ndarray
+
+            rng is a numpy.random.Generator or a seed, None for
+            fresh entropy
+            Below lambtha = 10 uniforms are inverted through the CDF
+            table, above Hormann's PTRS transformed rejection is
+            used, which accepts about 90% of its proposals
+        '''
+        rng = np.random.default_rng(rng)
+        lambtha = self.lambtha
+        if lambtha < 10:
+            table = self.table()
+            table.extend(table.last)
+            return table.quantiles(engine.uniforms(rng, n)).astype(np.int64)
+        log_lambtha = log(lambtha)
+        b = 0.931 + 2.53 * sqrt(lambtha)
+        a = -0.059 + 0.02483 * b
+        log_alpha = log(1.1239 + 1.1328 / (b - 3.4))
+        v_r = 0.9277 - 3.6224 / (b - 2)
+
+        def propose(rng, size):
+            '''PTRS proposals and their acceptance mask'''
+            u = engine.uniforms(rng, size) - 0.5
+            v = engine.uniforms(rng, size)
+            us = 0.5 - np.abs(u)
+            k = np.floor((2 * a / us + b) * u + lambtha + 0.43)
+            accepted = (us >= 0.07) & (v <= v_r)
+            check = ~accepted & (k >= 0) & ((us >= 0.013) | (v <= us))
+            k_check = k[check]
+            us = us[check]
+            accepted[check] = (np.log(v[check]) + log_alpha -
+                               np.log(a / (us * us) + b) <=
+                               k_check * log_lambtha - lambtha -
+                               engine.lgamma_array(k_check + 1))
+            return k.astype(np.int64), accepted
+
+        return engine.rejection_sample(n, rng, propose)
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+    Numeric helpers shared by the distribution classes
+    is_batch = __import__('prob_engine').is_batch
+    lgamma_array = __import__('prob_engine').lgamma_array
+    erfc_array = __import__('prob_engine').erfc_array
+    standard_normal_ppf = __import__('prob_engine').standard_normal_ppf
+    counts = __import__('prob_engine').counts
+    CDFTable = __import__('prob_engine').CDFTable
+    Moments = __import__('prob_engine').Moments
+    OnlineFit = __import__('prob_engine').OnlineFit
+    uniforms = __import__('prob_engine').uniforms
+    rejection_sample = __import__('prob_engine').rejection_sample
+"""
+
+
+from math import erfc, lgamma, pi, sqrt
+import numpy as np
+
+
+"""lgamma and erfc applied element-wise, as object arrays"""
+_lgamma = np.frompyfunc(lgamma, 1, 1)
+_erfc = np.frompyfunc(erfc, 1, 1)
+
+"""Coefficients of Acklam's rational approximation of the standard
+normal quantile: central region (a, b) and tails (c, d)"""
+ACKLAM_A = (-3.969683028665376e+01, 2.209460984245205e+02,
+            -2.759285104469687e+02, 1.383577518672690e+02,
+            -3.066479806614716e+01, 2.506628277459239e+00)
+ACKLAM_B = (-5.447609879822406e+01, 1.615858368580409e+02,
+            -1.556989798598866e+02, 6.680131188771972e+01,
+            -1.328068155288572e+01, 1.)
+ACKLAM_C = (-7.784894002430293e-03, -3.223964580411365e-01,
+            -2.400758277161838e+00, -2.549732539343734e+00,
+            4.374664141464968e+00, 2.938163982698783e+00)
+ACKLAM_D = (7.784695709041462e-03, 3.224671290700398e-01,
+            2.445134137142996e+00, 3.754408661907416e+00, 1.)
+ACKLAM_LOW = 0.02425
+
+
+def is_batch(value):
+    """True if value is a list, tuple or numpy.ndarray of values"""
+    return isinstance(value, (list, tuple, np.ndarray))
+
+
+def lgamma_array(values):
+    """Returns log|gamma(x)| for every x of a numpy.ndarray"""
+    return np.asarray(_lgamma(values), dtype=float)
+
+
+def erfc_array(values):
+    """Returns erfc(x) for every x of a numpy.ndarray"""
+    return np.asarray(_erfc(values), dtype=float)
+
+
+def _polynomial(coefficients, x):
+    """Horner evaluation, highest degree first"""
+    result = coefficients[0]
+    for coefficient in coefficients[1:]:
+        result = result * x + coefficient
+    return result
+
+
+def standard_normal_ppf(p):
+    """
+    Quantile function of the standard normal distribution
+
+    Acklam's rational approximation (relative error below 1.2e-9)
+    followed by one Halley step on erfc, which brings it to full
+    double precision.
+
+    Args:
+        p: probability, a number or a list/tuple/numpy.ndarray
+
+    Returns:
+        z such that P(Z <= z) = p, -inf for p = 0, inf for p = 1 and
+        nan outside [0, 1]; a float for a number, else a
+        numpy.ndarray
+    """
+    batch = is_batch(p)
+    p = np.asarray(p, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        q = p - 0.5
+        r = q * q
+        z = (_polynomial(ACKLAM_A, r) * q / _polynomial(ACKLAM_B, r))
+        s = np.sqrt(-2 * np.log(np.minimum(p, 1 - p)))
+        tail = _polynomial(ACKLAM_C, s) / _polynomial(ACKLAM_D, s)
+        z = np.where(np.abs(q) <= 0.5 - ACKLAM_LOW, z,
+                     np.where(q < 0, tail, -tail))
+        # measure the error on the nearer tail, 1 - p is exact for
+        # p >= 0.5 so the upper tail keeps its precision
+        upper = q > 0
+        tail_p = 0.5 * erfc_array(np.where(upper, z, -z) / sqrt(2))
+        error = np.where(upper, (1 - p) - tail_p, tail_p - p)
+        u = error * sqrt(2 * pi) * np.exp(z * z / 2)
+        z = z - u / (1 + z * u / 2)
+    z = np.where(p == 0, -np.inf, np.where(p == 1, np.inf, z))
+    z = np.where((p >= 0) & (p <= 1), z, np.nan)
+    return z if batch else float(z)
+
+
+def uniforms(rng, n):
+    """
+    Returns n uniforms in the open interval (0, 1)
+
+    They are the centres of 2**52 equal bins, exact in a float and
+    never 0 or 1, so their logs and quantiles are finite.
+    """
+    return (rng.integers(0, 2 ** 52, n) + 0.5) / 2 ** 52
+
+
+def rejection_sample(n, rng, propose):
+    """
+    Collects n accepted draws from a vectorized rejection sampler
+
+    Args:
+        n: number of draws
+        rng: numpy.random.Generator
+        propose: function of (rng, size) returning (candidates,
+            accepted) for size proposals, accepted being a mask
+
+    Returns:
+        int numpy.ndarray of n draws
+    """
+    out = np.empty(n, dtype=np.int64)
+    filled = 0
+    while filled < n:
+        # a few more proposals than missing draws, the acceptance
+        # rate of the samplers used here is above 85%
+        candidates, accepted = propose(rng, (n - filled) * 5 // 4 + 16)
+        draws = candidates[accepted][:n - filled]
+        out[filled:filled + draws.size] = draws
+        filled += draws.size
+    return out
+
+
+def counts(k, truncate_first):
+    """
+    Turns a batch of k values into integer counts
+
+    Args:
+        k: list, tuple or numpy.ndarray of numbers of successes
+        truncate_first: True to truncate k to an int before testing
+            k < 0 (so -0.5 counts as 0), False to test first
+
+    Returns:
+        (counts, valid): float numpy.ndarray of whole numbers with 0
+        where k is negative, and the mask of the non negative k
+    """
+    k = np.asarray(k, dtype=float)
+    if truncate_first:
+        k = np.trunc(k)
+    valid = k >= 0
+    return np.where(valid, np.trunc(k), 0.), valid
+
+
+class CDFTable:
+    """
+    PMF and CDF of a discrete distribution at k = 0 .. size - 1
+
+    The table starts at k_max + 1 entries and grows, at least doubling,
+    when a larger k is requested, up to last: the largest k whose PMF
+    still matters (n for a binomial). Past last the CDF stays at its
+    final value. Lookups inside the table are O(1) and count as hits,
+    lookups that grow it count as misses.
+    """
+
+    def __init__(self, log_pmf, last, k_max, params):
+        """
+        Args:
+            log_pmf: function returning log(PMF) for an int
+                numpy.ndarray of k
+            last: largest k stored in the table
+            k_max: largest k of the initial table
+            params: parameters of the distribution the table was
+                built for, to detect when they change
+        """
+        self.log_pmf = log_pmf
+        self.last = int(last)
+        self.params = params
+        self.pmf = np.empty(0)
+        self.cdf = np.empty(0)
+        self.hits = 0
+        self.misses = 0
+        self.extend(k_max)
+
+    @property
+    def size(self):
+        """Number of k covered by the table"""
+        return len(self.cdf)
+
+    @property
+    def nbytes(self):
+        """Memory held by the PMF and CDF arrays, in bytes"""
+        return self.pmf.nbytes + self.cdf.nbytes
+
+    def extend(self, k):
+        """Grows the table to cover k, capped at last"""
+        k = min(max(int(k), 2 * self.size - 1), self.last)
+        if k < self.size:
+            return
+        pmf = np.exp(self.log_pmf(np.arange(self.size, k + 1)))
+        start = self.cdf[-1:] if self.size else [0.]
+        # continue the running sum so the CDF matches one full cumsum
+        cdf = np.cumsum(np.concatenate((start, pmf)))[1:]
+        self.pmf = np.concatenate((self.pmf, pmf))
+        self.cdf = np.concatenate((self.cdf, np.minimum(cdf, 1.)))
+
+    def lookup(self, k):
+        """Returns the table index for an int k >= 0, growing it if needed"""
+        k = min(k, self.last)
+        if k < self.size:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.extend(k)
+        return k
+
+    def lookup_batch(self, k):
+        """Returns the table indices for an int numpy.ndarray of k >= 0"""
+        k = np.minimum(k, self.last)
+        missing = int(np.count_nonzero(k >= self.size))
+        self.hits += k.size - missing
+        self.misses += missing
+        if missing:
+            self.extend(k.max())
+        return k
+
+    def quantiles(self, u):
+        """
+        Inverse transform: smallest k with CDF(k) >= u for every
+        uniform u, the table should already cover the range of k
+        """
+        return np.minimum(np.searchsorted(self.cdf, u), self.size - 1)
+
+    def cache_info(self):
+        """Returns the hit/miss counters, hit ratio and table size"""
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.,
+                'size': self.size, 'nbytes': self.nbytes}
+
+
+class Moments:
+    """
+    Count, mean and sum of squared deviations (M2) of a stream
+
+    Chunks are reduced with numpy and folded in with Chan's parallel
+    update, which for a single value is Welford's update. Two
+    accumulators, for example from two worker processes, merge the
+    same way, so the result does not depend on how the stream was
+    split.
+    """
+
+    def __init__(self):
+        """Empty accumulator"""
+        self.count = 0
+        self.mean = 0.
+        self.m2 = 0.
+
+    @property
+    def variance(self):
+        """Population variance, M2 / count"""
+        return self.m2 / self.count
+
+    def update(self, chunk):
+        """
+        Adds a chunk of values: a number, a list, tuple or
+        numpy.ndarray, or any iterable such as a generator
+
+        Returns:
+            the accumulator
+        """
+        if is_batch(chunk) or np.isscalar(chunk):
+            values = np.asarray(chunk, dtype=float).ravel()
+        else:
+            values = np.fromiter(chunk, dtype=float)
+        if not values.size:
+            return self
+        mean = values.mean()
+        return self._combine(values.size, mean,
+                             np.square(values - mean).sum())
+
+    def merge(self, other):
+        """Adds the values seen by another accumulator, returns self"""
+        return self._combine(other.count, other.mean, other.m2)
+
+    def _combine(self, count, mean, m2):
+        """Chan's update with the moments of a disjoint batch"""
+        if not count:
+            return self
+        total = self.count + count
+        delta = float(mean) - self.mean
+        self.mean += delta * count / total
+        self.m2 += float(m2) + delta * delta * self.count * count / total
+        self.count = total
+        return self
+
+
+class OnlineFit:
+    """
+    Mixin giving a distribution streaming fits: partial_fit folds
+    chunks into a Moments accumulator and _fit, defined by the
+    distribution, sets the parameters from it
+    """
+
+    moments = None
+
+    def partial_fit(self, chunk):
+        """
+        Updates the fit with a chunk of data: a number, a list,
+        tuple or numpy.ndarray, or any iterable. The parameters are
+        refit once at least two values have been seen.
+
+        Returns:
+            the distribution
+        """
+        if self.moments is None:
+            self.moments = Moments()
+        self.moments.update(chunk)
+        if self.moments.count >= 2:
+            self._fit()
+        return self
+
+    def merge(self, other):
+        """
+        Adds the data fitted by another instance of the distribution,
+        for example one fitted in a worker process, and refits
+
+        Returns:
+            the distribution
+        """
+        if other.moments is None:
+            return self
+        if self.moments is None:
+            self.moments = Moments()
+        self.moments.merge(other.moments)
+        if self.moments.count >= 2:
+            self._fit()
+        return self
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+from math import exp, log
+import random
+import time
+Binomial = __import__('binomial').Binomial
+Exponential = __import__('exponential').Exponential
+Normal = __import__('normal').Normal
+Poisson = __import__('poisson').Poisson
+
+
+def naive_poisson(lambtha):
+    """Knuth's multiplication loop"""
+    limit = exp(-lambtha)
+    k = 0
+    product = random.random()
+    while product > limit:
+        k += 1
+        product *= random.random()
+    return k
+
+
+def naive_binomial(n, p):
+    """Sum of n Bernoulli trials"""
+    return sum(random.random() < p for _ in range(n))
+
+
+def naive_normal(mean, stddev):
+    """Sum of 12 uniforms, the classic loop approximation"""
+    return mean + stddev * (sum(random.random() for _ in range(12)) - 6)
+
+
+def naive_exponential(lambtha):
+    """Inverse transform of one uniform"""
+    return -log(1 - random.random()) / lambtha
+
+
+def rate(func, draws):
+    """Returns draws per second of func(), which makes draws draws"""
+    start = time.perf_counter()
+    func()
+    return draws / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    loop_draws = 20000
+    block_draws = 1000000
+    cases = [
+        ("Poisson(3)", Poisson(lambtha=3.),
+         lambda: naive_poisson(3.)),
+        ("Poisson(500)", Poisson(lambtha=500.),
+         lambda: naive_poisson(500.)),
+        ("Binomial(40, 0.1)", Binomial(n=40, p=0.1),
+         lambda: naive_binomial(40, 0.1)),
+        ("Binomial(1000, 0.4)", Binomial(n=1000, p=0.4),
+         lambda: naive_binomial(1000, 0.4)),
+        ("Normal(0, 1)", Normal(), lambda: naive_normal(0., 1.)),
+        ("Exponential(2)", Exponential(lambtha=2.),
+         lambda: naive_exponential(2.)),
+    ]
+    for name, dist, naive in cases:
+        loop = rate(lambda: [naive() for _ in range(loop_draws)],
+                    loop_draws)
+        block = rate(lambda: dist.sample(block_draws, rng=0), block_draws)
+        print("{:<20} loop {:>12,.0f}/s  sample {:>12,.0f}/s  ({:.0f}x)"
+              .format(name, loop, block, block / loop))
+    block = rate(lambda: Normal().sample(block_draws, rng=0,
+                                         method='box_muller'), block_draws)
+    print("{:<20} {:>31}  {:>12,.0f}/s".format("Normal box_muller", "",
+                                               block))